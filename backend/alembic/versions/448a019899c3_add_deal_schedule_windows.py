@@ -0,0 +1,51 @@
+"""Add deal_schedule_windows for active-now queries
+
+Revision ID: 448a019899c3
+Revises: a65c7f948839
+Create Date: 2026-01-12 19:04:51.203117
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from app.schedule import compute_schedule_windows
+
+
+# revision identifiers, used by Alembic.
+revision: str = '448a019899c3'
+down_revision: Union[str, None] = 'a65c7f948839'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    schedule_windows = op.create_table('deal_schedule_windows',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('deal_id', sa.Integer(), nullable=False),
+    sa.Column('minutes', postgresql.INT4RANGE(), nullable=False),
+    sa.ForeignKeyConstraint(['deal_id'], ['deals.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_deal_schedule_windows_deal_id'), 'deal_schedule_windows', ['deal_id'], unique=False)
+    op.create_index('ix_deal_schedule_windows_minutes', 'deal_schedule_windows', ['minutes'], unique=False, postgresql_using='gist')
+
+    # Backfill windows for existing deals (needs a live connection)
+    if context.is_offline_mode():
+        return
+    deals = op.get_bind().execute(sa.text('SELECT id, days_active, time_start, time_end FROM deals')).fetchall()
+    rows = [
+        {'deal_id': deal.id, 'minutes': window}
+        for deal in deals
+        for window in compute_schedule_windows(deal.days_active, deal.time_start, deal.time_end)
+    ]
+    if rows:
+        op.bulk_insert(schedule_windows, rows)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_deal_schedule_windows_minutes', table_name='deal_schedule_windows', postgresql_using='gist')
+    op.drop_index(op.f('ix_deal_schedule_windows_deal_id'), table_name='deal_schedule_windows')
+    op.drop_table('deal_schedule_windows')
@@ -0,0 +1,40 @@
+"""Add foreign key and sort key indexes
+
+Revision ID: 83fc34371d04
+Revises: b9f4eb90b46c
+Create Date: 2026-01-21 10:15:42.903318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '83fc34371d04'
+down_revision: Union[str, None] = 'b9f4eb90b46c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Foreign keys: get_deals(business_id=), get_comments(deal_id= / business_id=) and cascade deletes
+    op.create_index(op.f('ix_deals_business_id'), 'deals', ['business_id'], unique=False)
+    op.create_index(op.f('ix_comments_deal_id'), 'comments', ['deal_id'], unique=False)
+    op.create_index(op.f('ix_comments_business_id'), 'comments', ['business_id'], unique=False)
+    # Sort keys, with id as the keyset tiebreaker
+    op.create_index('ix_deals_vote_score_id', 'deals', ['vote_score', 'id'], unique=False)
+    op.create_index('ix_deals_created_at_id', 'deals', ['created_at', 'id'], unique=False)
+    op.create_index('ix_comments_vote_score_id', 'comments', ['vote_score', 'id'], unique=False)
+    op.create_index('ix_comments_created_at_id', 'comments', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_comments_created_at_id', table_name='comments')
+    op.drop_index('ix_comments_vote_score_id', table_name='comments')
+    op.drop_index('ix_deals_created_at_id', table_name='deals')
+    op.drop_index('ix_deals_vote_score_id', table_name='deals')
+    op.drop_index(op.f('ix_comments_business_id'), table_name='comments')
+    op.drop_index(op.f('ix_comments_deal_id'), table_name='comments')
+    op.drop_index(op.f('ix_deals_business_id'), table_name='deals')
@@ -0,0 +1,34 @@
+"""Store deal cards without business coordinates at their shown location
+
+Revision ID: a3d6e9f2c7b5
+Revises: f7c2a9d3b4e1
+Create Date: 2026-01-30 14:03:11.482907
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3d6e9f2c7b5'
+down_revision: Union[str, None] = 'f7c2a9d3b4e1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Cards of businesses without coordinates are shown at the downtown fallback but were
+    # stored with NULL coordinates, so bbox and radius searches never matched them.
+    # Store them where the card says they are.
+    op.execute("""
+        UPDATE deal_cards
+        SET latitude = (card -> 'location' ->> 'lat')::float8,
+            longitude = (card -> 'location' ->> 'lng')::float8
+        WHERE latitude IS NULL OR longitude IS NULL
+    """)
+
+
+def downgrade() -> None:
+    # The stored coordinates match the cards either way; nothing to undo
+    pass
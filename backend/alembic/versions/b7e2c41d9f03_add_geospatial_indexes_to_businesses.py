@@ -0,0 +1,33 @@
+"""Add geospatial indexes to businesses
+
+Revision ID: b7e2c41d9f03
+Revises: 448a019899c3
+Create Date: 2026-01-14 21:37:08.551902
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e2c41d9f03'
+down_revision: Union[str, None] = '448a019899c3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # earthdistance (built on cube) provides ll_to_earth/earth_box for radius searches
+    op.execute('CREATE EXTENSION IF NOT EXISTS cube')
+    op.execute('CREATE EXTENSION IF NOT EXISTS earthdistance')
+    op.create_index('ix_businesses_lat_lng', 'businesses', ['latitude', 'longitude'], unique=False)
+    op.create_index('ix_businesses_earth_point', 'businesses', [sa.text('ll_to_earth(latitude, longitude)')],
+                    unique=False, postgresql_using='gist')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_businesses_earth_point', table_name='businesses', postgresql_using='gist')
+    op.drop_index('ix_businesses_lat_lng', table_name='businesses')
+    # Extensions are left installed; other objects may depend on them
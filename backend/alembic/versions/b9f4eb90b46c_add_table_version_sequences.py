@@ -0,0 +1,31 @@
+"""Add table version sequences for ETags
+
+Revision ID: b9f4eb90b46c
+Revises: b7e2c41d9f03
+Create Date: 2026-01-18 16:52:30.774410
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b9f4eb90b46c'
+down_revision: Union[str, None] = 'b7e2c41d9f03'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+VERSIONED_TABLES = ('businesses', 'deals', 'comments')
+
+
+def upgrade() -> None:
+    # Bumped by the API after each committed write; read to build ETags
+    for table in VERSIONED_TABLES:
+        op.execute(sa.schema.CreateSequence(sa.Sequence(f'{table}_version_seq')))
+
+
+def downgrade() -> None:
+    for table in VERSIONED_TABLES:
+        op.execute(sa.schema.DropSequence(sa.Sequence(f'{table}_version_seq')))
@@ -0,0 +1,75 @@
+"""Add deal full-text search vector and tags index
+
+Revision ID: c3a8d51e7f26
+Revises: 83fc34371d04
+Create Date: 2026-01-24 14:02:11.518204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3a8d51e7f26'
+down_revision: Union[str, None] = '83fc34371d04'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('deals', sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+
+    # A generated column can't read the business name, so a trigger maintains the vector.
+    # Business name and tags rank highest, then the description, then the item lists.
+    op.execute("""
+        CREATE FUNCTION deals_search_vector_update() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector :=
+                setweight(to_tsvector('english', coalesce((SELECT name FROM businesses WHERE id = NEW.business_id), '')), 'A') ||
+                setweight(to_tsvector('english', coalesce(array_to_string(NEW.tags, ' '), '')), 'A') ||
+                setweight(to_tsvector('english', coalesce(NEW.description, '')), 'B') ||
+                setweight(to_tsvector('english', coalesce(NEW.food_items, '') || ' ' || coalesce(NEW.drink_items, '')), 'C');
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER deals_search_vector_update
+        BEFORE INSERT OR UPDATE OF business_id, description, food_items, drink_items, tags ON deals
+        FOR EACH ROW EXECUTE FUNCTION deals_search_vector_update()
+    """)
+
+    # Renaming a business re-indexes its deals (SET business_id = business_id fires the trigger above)
+    op.execute("""
+        CREATE FUNCTION businesses_refresh_deal_search() RETURNS trigger AS $$
+        BEGIN
+            UPDATE deals SET business_id = business_id WHERE business_id = NEW.id;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER businesses_refresh_deal_search
+        AFTER UPDATE OF name ON businesses
+        FOR EACH ROW WHEN (OLD.name IS DISTINCT FROM NEW.name)
+        EXECUTE FUNCTION businesses_refresh_deal_search()
+    """)
+
+    # Backfill existing deals
+    op.execute("UPDATE deals SET business_id = business_id")
+
+    op.create_index('ix_deals_search_vector', 'deals', ['search_vector'], unique=False, postgresql_using='gin')
+    op.create_index('ix_deals_tags', 'deals', ['tags'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_deals_tags', table_name='deals')
+    op.drop_index('ix_deals_search_vector', table_name='deals')
+    op.execute("DROP TRIGGER businesses_refresh_deal_search ON businesses")
+    op.execute("DROP FUNCTION businesses_refresh_deal_search()")
+    op.execute("DROP TRIGGER deals_search_vector_update ON deals")
+    op.execute("DROP FUNCTION deals_search_vector_update()")
+    op.drop_column('deals', 'search_vector')
@@ -0,0 +1,28 @@
+"""Drop image_srcset from stored deal cards
+
+Revision ID: c8e4f1a6d2b9
+Revises: a3d6e9f2c7b5
+Create Date: 2026-02-03 10:21:47.193504
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8e4f1a6d2b9'
+down_revision: Union[str, None] = 'a3d6e9f2c7b5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # image_srcset is added when a card is served now, from the current image files;
+    # a stored copy would go stale when a source image changes
+    op.execute("UPDATE deal_cards SET card = card - 'image_srcset' WHERE card ? 'image_srcset'")
+
+
+def downgrade() -> None:
+    # Run `python -m app.cards` with the previous release to store srcsets again
+    pass
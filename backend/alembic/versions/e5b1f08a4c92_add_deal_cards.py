@@ -0,0 +1,97 @@
+"""Add deal_cards read model
+
+Revision ID: e5b1f08a4c92
+Revises: c3a8d51e7f26
+Create Date: 2026-01-27 09:41:26.330871
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b1f08a4c92'
+down_revision: Union[str, None] = 'c3a8d51e7f26'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# The card shape as of this revision (app.cards.enrich_deal), frozen here so later
+# changes to the app can't break upgrading a fresh database
+DEFAULT_IMAGES = [
+    '/craft-beer-bar-interior-with-taps.jpg',
+    '/cocktails-on-bar-with-lake-view.jpg',
+    '/fresh-oysters-on-ice-with-lemon.jpg',
+    '/wine-glasses-and-cheese-board-cozy-cafe.jpg',
+    '/street-tacos-with-margarita-mexican-food.jpg',
+    '/sushi-rolls-platter-fresh-fish.jpg',
+    '/giant-pizza-slice-new-york-style.jpg',
+    '/natural-wine-bottles-elegant-restaurant.jpg',
+]
+DEFAULT_LOCATION = (37.8044, -122.2712)  # downtown Oakland, for businesses without coordinates
+
+
+def upgrade() -> None:
+    op.create_table('deal_cards',
+    sa.Column('deal_id', sa.Integer(), nullable=False),
+    sa.Column('business_id', sa.Integer(), nullable=False),
+    sa.Column('latitude', sa.Float(), nullable=True),
+    sa.Column('longitude', sa.Float(), nullable=True),
+    sa.Column('card', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.ForeignKeyConstraint(['deal_id'], ['deals.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('deal_id')
+    )
+    op.create_index(op.f('ix_deal_cards_business_id'), 'deal_cards', ['business_id'], unique=False)
+    op.create_index('ix_deal_cards_lat_lng', 'deal_cards', ['latitude', 'longitude'], unique=False)
+    op.create_index('ix_deal_cards_earth_point', 'deal_cards', [sa.text('ll_to_earth(latitude, longitude)')],
+                    unique=False, postgresql_using='gist')
+
+    # Render cards for existing deals. Later card shape changes are rebuilt with
+    # `python -m app.cards`.
+    default_images = ', '.join(f"'{image}'" for image in DEFAULT_IMAGES)
+    default_image = f'(ARRAY[{default_images}])[d.id % {len(DEFAULT_IMAGES)} + 1]'
+    has_location = 'b.latitude IS NOT NULL AND b.longitude IS NOT NULL'
+    lat = f'CASE WHEN {has_location} THEN b.latitude ELSE {DEFAULT_LOCATION[0]} END'
+    lng = f'CASE WHEN {has_location} THEN b.longitude ELSE {DEFAULT_LOCATION[1]} END'
+    op.execute(f"""
+        INSERT INTO deal_cards (deal_id, business_id, latitude, longitude, card)
+        SELECT d.id, d.business_id, {lat}, {lng}, jsonb_build_object(
+            'id', d.id,
+            'business_id', d.business_id,
+            'restaurant_name', b.name,
+            'deal_description', COALESCE(d.description, ''),
+            'schedule', jsonb_build_object(
+                'days', COALESCE((SELECT jsonb_agg(initcap(day) ORDER BY ord)
+                                  FROM unnest(d.days_active) WITH ORDINALITY AS days (day, ord)),
+                                 '[]'::jsonb),
+                'start_time', COALESCE(d.time_start::text, ''),
+                'end_time', COALESCE(d.time_end::text, '')
+            ),
+            'vote_count', d.vote_score,
+            'address', b.address,
+            'phone', b.phone,
+            'google_place_id', b.google_place_id,
+            'created_by', d.created_by,
+            'created_at', to_jsonb(d.created_at),
+            'image_url', COALESCE(NULLIF(d.image_url, ''), {default_image}),
+            'location', jsonb_build_object('lat', {lat}, 'lng', {lng}),
+            'neighborhood', NULL,
+            'deal_type', d.deal_type,
+            'food_items', d.food_items,
+            'drink_items', d.drink_items,
+            'pricing', d.pricing,
+            'tags', to_jsonb(d.tags),
+            'website', b.website
+        )
+        FROM deals d
+        JOIN businesses b ON b.id = d.business_id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_deal_cards_earth_point', table_name='deal_cards')
+    op.drop_index('ix_deal_cards_lat_lng', table_name='deal_cards')
+    op.drop_index(op.f('ix_deal_cards_business_id'), table_name='deal_cards')
+    op.drop_table('deal_cards')
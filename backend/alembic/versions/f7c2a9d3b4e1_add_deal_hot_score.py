@@ -0,0 +1,48 @@
+"""Add deal hot score for hot/top/new sorting
+
+Revision ID: f7c2a9d3b4e1
+Revises: e5b1f08a4c92
+Create Date: 2026-01-29 10:12:47.203518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f7c2a9d3b4e1'
+down_revision: Union[str, None] = 'e5b1f08a4c92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Keyset pagination on (vote_score, id) needs a non-null score
+    op.execute("UPDATE deals SET vote_score = 0 WHERE vote_score IS NULL")
+    op.alter_column('deals', 'vote_score', existing_type=sa.Integer(), nullable=False, server_default='0')
+
+    # log10 of the net votes plus creation time, in units of three days: a deal needs ten
+    # times the votes to outrank one posted three days later. Anchored to creation time
+    # rather than now(), so scores never need re-decaying: newer deals simply start higher.
+    # extract(epoch) of a timestamptz doesn't depend on the session time zone, which is
+    # what makes IMMUTABLE (required for a generated column) truthful here.
+    op.execute("""
+        CREATE FUNCTION deal_hot_score(vote_score integer, created_at timestamptz)
+        RETURNS double precision AS $$
+            SELECT sign(vote_score)::float8 * log(greatest(abs(vote_score), 1)::float8)
+                   + coalesce(extract(epoch FROM created_at)::float8, 0) / 259200
+        $$ LANGUAGE sql IMMUTABLE PARALLEL SAFE
+    """)
+    op.add_column('deals', sa.Column('hot_score', sa.Float(),
+                                     sa.Computed('deal_hot_score(vote_score, created_at)', persisted=True),
+                                     nullable=False))
+    op.create_index('ix_deals_hot_score_id', 'deals', ['hot_score', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_deals_hot_score_id', table_name='deals')
+    op.drop_column('deals', 'hot_score')
+    op.execute("DROP FUNCTION deal_hot_score(integer, timestamptz)")
+    op.alter_column('deals', 'vote_score', existing_type=sa.Integer(), nullable=True, server_default=None)
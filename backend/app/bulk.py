@@ -0,0 +1,127 @@
+"""
+Streaming NDJSON/CSV parsing for bulk deal imports.
+
+Input is split into records as it arrives, so neither the API nor the CLI holds the
+whole upload in memory. CSV records may contain quoted newlines, and list columns
+(days_active, tags) are separated by ';'.
+
+CLI usage (runs the same import as POST /bulk/deals, straight against DATABASE_URL):
+
+    python -m app.bulk happy_hours.csv
+"""
+import codecs
+import csv
+import json
+import sys
+from typing import List, Optional, Tuple
+
+# Rows validated and written per transaction
+BATCH_SIZE = 500
+
+
+class ParseError(str):
+    """A record that couldn't be parsed; carries the error message"""
+
+
+class RecordSplitter:
+    """Incrementally split decoded text into records, keeping quoted CSV newlines intact"""
+
+    def __init__(self, quoted: bool):
+        self.quoted = quoted
+        self._decoder = codecs.getincrementaldecoder("utf-8-sig")()
+        self._buffer = ""
+        self._pending = ""
+
+    def _split(self, final: bool) -> List[str]:
+        *lines, self._buffer = self._buffer.split("\n")
+        if final:
+            lines.append(self._buffer)
+            self._buffer = ""
+        records = []
+        for line in lines:
+            record = self._pending + line
+            if self.quoted and record.count('"') % 2 and not final:
+                self._pending = record + "\n"
+                continue
+            self._pending = ""
+            record = record.rstrip("\r")
+            if record.strip():
+                records.append(record)
+        return records
+
+    def feed(self, chunk: bytes) -> List[str]:
+        self._buffer += self._decoder.decode(chunk)
+        return self._split(final=False)
+
+    def finish(self) -> List[str]:
+        self._buffer += self._decoder.decode(b"", final=True)
+        return self._split(final=True)
+
+
+class RecordParser:
+    """Turn records into (row_number, raw dict or ParseError); the CSV header row yields None"""
+
+    def __init__(self, fmt: str):
+        self.fmt = fmt
+        self.header: Optional[List[str]] = None
+        self.row_number = 0
+
+    def parse(self, record: str) -> Optional[Tuple[int, object]]:
+        if self.fmt == "csv" and self.header is None:
+            self.header = [name.strip() for name in next(csv.reader([record]))]
+            return None
+
+        self.row_number += 1
+        try:
+            if self.fmt == "csv":
+                values = next(csv.reader([record]))
+                if len(values) != len(self.header):
+                    return self.row_number, ParseError(f"expected {len(self.header)} columns, got {len(values)}")
+                # Empty cells mean "not provided"
+                return self.row_number, {name: value for name, value in zip(self.header, values) if value != ""}
+            raw = json.loads(record)
+        except (csv.Error, ValueError) as e:
+            return self.row_number, ParseError(f"could not parse row: {e}")
+        if not isinstance(raw, dict):
+            return self.row_number, ParseError("row must be a JSON object")
+        return self.row_number, raw
+
+
+def detect_format(content_type: str) -> str:
+    return "csv" if "csv" in (content_type or "").lower() else "ndjson"
+
+
+def main():
+    from app import crud, schemas
+    from app.database import SessionLocal
+
+    if len(sys.argv) != 2:
+        print(__doc__)
+        sys.exit(2)
+    path = sys.argv[1]
+    fmt = "csv" if path.lower().endswith(".csv") else "ndjson"
+    splitter, parser = RecordSplitter(quoted=fmt == "csv"), RecordParser(fmt)
+    result = schemas.BulkImportResult()
+
+    db = SessionLocal()
+    try:
+        batch = []
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(64 * 1024), b""):
+                batch.extend(parsed for parsed in map(parser.parse, splitter.feed(chunk)) if parsed)
+                if len(batch) >= BATCH_SIZE:
+                    crud.bulk_import_deals(db, batch, result)
+                    batch = []
+        batch.extend(parsed for parsed in map(parser.parse, splitter.finish()) if parsed)
+        if batch:
+            crud.bulk_import_deals(db, batch, result)
+        if result.deals_created:
+            crud.bump_table_versions(db, ("businesses", "deals"))
+    finally:
+        db.close()
+
+    print(result.model_dump_json(indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Read-through cache settings for the enriched deal listings
+DEALS_CACHE_TTL = float(os.getenv("DEALS_CACHE_TTL", "30"))  # seconds; 0 disables caching
+DEALS_CACHE_MAXSIZE = int(os.getenv("DEALS_CACHE_MAXSIZE", "256"))  # entries (in-process backend only)
+# Set when running several uvicorn workers so they share one cache and one invalidation
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL")
+
+
+# Both backends share one async interface (get/set/clear/close), since routes run on the
+# event loop and the Redis backend does network IO.
+class TTLCache:
+    """Thread-safe in-process cache with per-entry TTL and LRU eviction"""
+
+    def __init__(self, ttl: float, maxsize: int):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.maxsize > 0
+
+    async def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    async def set(self, key: Hashable, value: Any):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    async def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    async def close(self):
+        pass
+
+    def stats(self) -> dict:
+        return {
+            "backend": "memory",
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+        }
+
+
+class RedisCache:
+    """
+    Redis-backed cache shared by all workers. Values are stored as JSON, so callers
+    must cache JSON-serializable data. clear() bumps a generation counter that is part
+    of every key, so invalidation is one INCR and stale entries simply expire.
+    """
+
+    def __init__(self, url: str, ttl: float, prefix: str = "deals-cache"):
+        try:
+            # Only needed for multi-worker deployments; asyncio client, so lookups don't block the loop
+            import redis.asyncio as redis
+        except ImportError:
+            raise RuntimeError("CACHE_REDIS_URL is set but the redis package isn't installed (pip install redis)")
+
+        self.ttl = ttl
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    async def _key(self, key: Hashable) -> str:
+        generation = int(await self._client.get(f"{self.prefix}:generation") or 0)
+        digest = hashlib.sha1(repr(key).encode()).hexdigest()
+        return f"{self.prefix}:{generation}:{digest}"
+
+    async def get(self, key: Hashable) -> Optional[Any]:
+        raw = await self._client.get(await self._key(key)) if self.enabled else None
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(raw)
+
+    async def set(self, key: Hashable, value: Any):
+        if not self.enabled:
+            return
+        await self._client.set(await self._key(key), json.dumps(value), px=int(self.ttl * 1000))
+
+    async def clear(self):
+        await self._client.incr(f"{self.prefix}:generation")
+
+    async def close(self):
+        await self._client.aclose()
+
+    def stats(self) -> dict:
+        # Hits/misses are per worker; Redis handles its own eviction
+        return {
+            "backend": "redis",
+            "hits": self.hits,
+            "misses": self.misses,
+            "ttl": self.ttl,
+        }
+
+
+def build_cache():
+    """Cache for the enriched deal listings, shared via Redis when CACHE_REDIS_URL is set"""
+    if CACHE_REDIS_URL:
+        return RedisCache(CACHE_REDIS_URL, DEALS_CACHE_TTL)
+    return TTLCache(DEALS_CACHE_TTL, DEALS_CACHE_MAXSIZE)
@@ -0,0 +1,116 @@
+"""
+The frontend deal card: the shape /api/deals-enriched serves for each deal.
+
+Cards are rendered here once per change and stored in deal_cards (see
+crud.refresh_deal_cards), so listings serve stored JSON instead of rebuilding every
+row per request. After changing the card shape, rebuild the stored cards:
+
+    python -m app.cards
+
+A card's image_srcset isn't stored: it names the current image files, so it's looked
+up in images.renderer's srcset map when the card is served (with_image_srcset / serve_card).
+"""
+from typing import Optional
+
+from app import images
+
+# Default images for deals without custom images
+DEFAULT_IMAGES = [
+    "/craft-beer-bar-interior-with-taps.jpg",
+    "/cocktails-on-bar-with-lake-view.jpg",
+    "/fresh-oysters-on-ice-with-lemon.jpg",
+    "/wine-glasses-and-cheese-board-cozy-cafe.jpg",
+    "/street-tacos-with-margarita-mexican-food.jpg",
+    "/sushi-rolls-platter-fresh-fish.jpg",
+    "/giant-pizza-slice-new-york-style.jpg",
+    "/natural-wine-bottles-elegant-restaurant.jpg",
+]
+
+
+# Map position for businesses without coordinates: downtown Oakland
+DEFAULT_LOCATION = (37.8044, -122.2712)
+
+
+def card_location(row) -> tuple:
+    """(lat, lng) a card is shown at; also stored with the card for map filters"""
+    if row.latitude is None or row.longitude is None:
+        return DEFAULT_LOCATION
+    return row.latitude, row.longitude
+
+
+def get_default_image(deal_id: int) -> str:
+    """Return a consistent image for a deal based on its ID"""
+    return DEFAULT_IMAGES[deal_id % len(DEFAULT_IMAGES)]
+
+
+def enrich_deal(row) -> dict:
+    """Build the frontend deal shape from a joined deal/business row"""
+    image_url = row.image_url or get_default_image(row.id)
+    lat, lng = card_location(row)
+    enriched_deal = {
+        "id": row.id,
+        "business_id": row.business_id,
+        "restaurant_name": row.business_name,
+        "deal_description": row.description or "",
+        "schedule": {
+            "days": [day.capitalize() for day in (row.days_active or [])],
+            "start_time": str(row.time_start) if row.time_start else "",
+            "end_time": str(row.time_end) if row.time_end else ""
+        },
+        "vote_count": row.vote_score,
+        "address": row.address,
+        "phone": row.phone,
+        "google_place_id": row.google_place_id,
+        "created_by": row.created_by,
+        "created_at": row.created_at.isoformat() if row.created_at else None,
+        # Use deal's image_url if set, otherwise assign default based on deal ID
+        "image_url": image_url,
+        # Location for map - use actual coordinates from business, fallback to Oakland downtown
+        "location": {"lat": lat, "lng": lng},
+        "neighborhood": None,  # TODO: Add to database later
+        # Additional fields that might be useful
+        "deal_type": row.deal_type,
+        "food_items": row.food_items,
+        "drink_items": row.drink_items,
+        "pricing": row.pricing,
+        "tags": row.tags,
+        "website": row.website,
+    }
+    # Only present for near= searches
+    if "distance_m" in row._mapping:
+        enriched_deal["distance_m"] = round(row.distance_m)
+    # Only present for full-text searches
+    if "rank" in row._mapping:
+        enriched_deal["rank"] = row.rank
+    return enriched_deal
+
+
+def with_image_srcset(card: dict) -> dict:
+    """Add the resized WebP/JPEG variants of a card's image (None for images we don't host)"""
+    card["image_srcset"] = images.renderer.srcset(card["image_url"])
+    return card
+
+
+def serve_card(card: str, image_url: Optional[str]) -> str:
+    """with_image_srcset for a stored card's JSON text (an object, so it ends in "}")"""
+    return f'{card[:-1]},"image_srcset":{images.renderer.srcset_json(image_url)}}}'
+
+
+def main():
+    from sqlalchemy import true
+
+    from app import crud
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        count = crud.refresh_deal_cards(db, true())
+        db.commit()
+        crud.bump_table_versions(db, ("deals",))
+    finally:
+        db.close()
+    print(f"Rebuilt {count} deal cards")
+
+
+if __name__ == "__main__":
+    main()
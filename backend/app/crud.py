@@ -1,6 +1,70 @@
-from sqlalchemy.orm import Session
-from app import models, schemas
-from typing import Optional
+from pydantic import ValidationError
+from sqlalchemy import (
+    Float, Integer, Text, and_, cast, column, func, insert, inspect, literal_column, select, text, update, values,
+)
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Query, Session
+from app import models, schemas, schedule, pagination, cards
+from typing import Dict, List, Optional, Tuple
+
+
+# Keyset sort keys for list endpoints; each ends in the primary key as a tiebreaker
+BUSINESS_SORT_KEY = (models.Business.id,)
+DEAL_SORT_KEY = (models.Deal.id,)
+COMMENT_SORT_KEY = (models.Comment.id,)
+
+# Deal rankings for ?sort=, highest first; each has a matching index
+DEAL_RANKINGS = {
+    "hot": (models.Deal.hot_score, models.Deal.id),
+    "top": (models.Deal.vote_score, models.Deal.id),
+    "new": (models.Deal.id,),
+}
+
+
+
+def _projection(model, schema):
+    """The columns a list schema reads, selected as plain rows instead of ORM objects"""
+    return tuple(getattr(model, name) for name in schema.model_fields)
+
+
+BUSINESS_COLUMNS = _projection(models.Business, schemas.Business)
+DEAL_COLUMNS = _projection(models.Deal, schemas.Deal)
+COMMENT_COLUMNS = _projection(models.Comment, schemas.Comment)
+
+
+def _paged(query, sort_key, skip: int, limit: int, cursor: Optional[str], descending: bool = False):
+    """
+    Apply keyset pagination when a cursor is given, else the deprecated offset. An empty
+    cursor counts as none, as in keyset_paginate, so ?cursor= still honours skip.
+    """
+    query = pagination.keyset_paginate(query, sort_key, cursor, descending=descending)
+    if not cursor:
+        query = query.offset(skip)
+    return query.limit(limit)
+
+
+def _page(query, sort_key, skip: int, limit: int, cursor: Optional[str], descending: bool = False):
+    return _paged(query, sort_key, skip, limit, cursor, descending).all()
+
+
+def _apply_vote(db: Session, model, entity_id: int, vote: int, commit: bool = True):
+    """
+    Add a vote in a single atomic UPDATE ... RETURNING, so concurrent votes can't be lost
+    and a click costs one round trip instead of select/commit/refresh.
+    Returns a plain row (not expired by the commit) or None if the id doesn't exist.
+    """
+    stmt = (
+        update(model)
+        .where(model.id == entity_id)
+        .values(vote_score=func.coalesce(model.vote_score, 0) + vote)
+        .returning(*(column.expression for column in inspect(model).column_attrs if not column.deferred))
+        .execution_options(synchronize_session=False)
+    )
+    voted = db.execute(stmt).first()
+    if commit:
+        db.commit()
+    return voted
 
 
 # Business CRUD operations
@@ -8,8 +72,8 @@ def get_business(db: Session, business_id: int):
     return db.query(models.Business).filter(models.Business.id == business_id).first()
 
 
-def get_businesses(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Business).offset(skip).limit(limit).all()
+def get_businesses(db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
+    return _page(db.query(*BUSINESS_COLUMNS), BUSINESS_SORT_KEY, skip, limit, cursor)
 
 
 def create_business(db: Session, business: schemas.BusinessCreate):
@@ -26,6 +90,8 @@ def update_business(db: Session, business_id: int, business: schemas.BusinessUpd
         update_data = business.model_dump(exclude_unset=True)
         for key, value in update_data.items():
             setattr(db_business, key, value)
+        db.flush()
+        refresh_deal_cards(db, models.Deal.business_id == business_id)
         db.commit()
         db.refresh(db_business)
     return db_business
@@ -41,29 +107,51 @@ def delete_business(db: Session, business_id: int):
 
 
 def update_business_vote(db: Session, business_id: int, vote: int):
-    db_business = get_business(db, business_id)
-    if db_business:
-        db_business.vote_score += vote
-        db.commit()
-        db.refresh(db_business)
-    return db_business
+    return _apply_vote(db, models.Business, business_id, vote)
 
 
 # Deal CRUD operations
+def _sync_schedule_windows(db_deal: models.Deal):
+    """Rebuild the precomputed minute-of-week windows used by active_at queries"""
+    windows = schedule.compute_schedule_windows(db_deal.days_active, db_deal.time_start, db_deal.time_end)
+    db_deal.schedule_windows = [models.DealScheduleWindow(minutes=window) for window in windows]
+
+
+def _filter_active_at(query, active_minute: Optional[int], deal_id=models.Deal.id):
+    if active_minute is None:
+        return query
+    active_deal_ids = select(models.DealScheduleWindow.deal_id).where(
+        models.DealScheduleWindow.minutes.contains(active_minute)
+    )
+    return query.filter(deal_id.in_(active_deal_ids))
+
+
 def get_deal(db: Session, deal_id: int):
     return db.query(models.Deal).filter(models.Deal.id == deal_id).first()
 
 
-def get_deals(db: Session, skip: int = 0, limit: int = 100, business_id: Optional[int] = None):
-    query = db.query(models.Deal)
+def deal_sort_key(sort: Optional[str]):
+    """Keyset columns of get_deals rows for a ?sort= ranking (descending), or the default id order"""
+    return DEAL_RANKINGS[sort] if sort else DEAL_SORT_KEY
+
+
+def get_deals(db: Session, skip: int = 0, limit: int = 100, business_id: Optional[int] = None,
+              active_minute: Optional[int] = None, cursor: Optional[str] = None, sort: Optional[str] = None):
+    sort_key = deal_sort_key(sort)
+    # Rows carry their sort key too, for the next page's cursor
+    query = db.query(*DEAL_COLUMNS, *(column for column in sort_key if column.key not in schemas.Deal.model_fields))
     if business_id:
         query = query.filter(models.Deal.business_id == business_id)
-    return query.offset(skip).limit(limit).all()
+    query = _filter_active_at(query, active_minute)
+    return _page(query, sort_key, skip, limit, cursor, descending=sort is not None)
 
 
 def create_deal(db: Session, deal: schemas.DealCreate):
     db_deal = models.Deal(**deal.model_dump())
+    _sync_schedule_windows(db_deal)
     db.add(db_deal)
+    db.flush()
+    refresh_deal_cards(db, models.Deal.id == db_deal.id)
     db.commit()
     db.refresh(db_deal)
     return db_deal
@@ -75,6 +163,10 @@ def update_deal(db: Session, deal_id: int, deal: schemas.DealUpdate):
         update_data = deal.model_dump(exclude_unset=True)
         for key, value in update_data.items():
             setattr(db_deal, key, value)
+        if update_data.keys() & {"days_active", "time_start", "time_end"}:
+            _sync_schedule_windows(db_deal)
+        db.flush()
+        refresh_deal_cards(db, models.Deal.id == deal_id)
         db.commit()
         db.refresh(db_deal)
     return db_deal
@@ -90,12 +182,11 @@ def delete_deal(db: Session, deal_id: int):
 
 
 def update_deal_vote(db: Session, deal_id: int, vote: int):
-    db_deal = get_deal(db, deal_id)
-    if db_deal:
-        db_deal.vote_score += vote
-        db.commit()
-        db.refresh(db_deal)
-    return db_deal
+    voted = _apply_vote(db, models.Deal, deal_id, vote, commit=False)
+    if voted is not None:
+        _set_card_vote_count(db, deal_id, voted.vote_score)
+    db.commit()
+    return voted
 
 
 # Comment CRUD operations
@@ -103,13 +194,14 @@ def get_comment(db: Session, comment_id: int):
     return db.query(models.Comment).filter(models.Comment.id == comment_id).first()
 
 
-def get_comments(db: Session, skip: int = 0, limit: int = 100, business_id: Optional[int] = None, deal_id: Optional[int] = None):
-    query = db.query(models.Comment)
+def get_comments(db: Session, skip: int = 0, limit: int = 100, business_id: Optional[int] = None,
+                 deal_id: Optional[int] = None, cursor: Optional[str] = None):
+    query = db.query(*COMMENT_COLUMNS)
     if business_id:
         query = query.filter(models.Comment.business_id == business_id)
     if deal_id:
         query = query.filter(models.Comment.deal_id == deal_id)
-    return query.offset(skip).limit(limit).all()
+    return _page(query, COMMENT_SORT_KEY, skip, limit, cursor)
 
 
 def create_comment(db: Session, comment: schemas.CommentCreate):
@@ -141,9 +233,396 @@ def delete_comment(db: Session, comment_id: int):
 
 
 def update_comment_vote(db: Session, comment_id: int, vote: int):
-    db_comment = get_comment(db, comment_id)
-    if db_comment:
-        db_comment.vote_score += vote
-        db.commit()
-        db.refresh(db_comment)
-    return db_comment
+    return _apply_vote(db, models.Comment, comment_id, vote)
+
+
+# Batched votes, applied in this order so concurrent batches lock tables in the same order
+VOTE_MODELS = {"business": models.Business, "deal": models.Deal, "comment": models.Comment}
+
+
+def _id_values(pairs, name: str, value_name: str):
+    """A VALUES list of (id, integer) rows to join an UPDATE against"""
+    return values(column("id", Integer), column(value_name, Integer), name=name).data(sorted(pairs))
+
+
+def apply_vote_batch(db: Session, operations: List[schemas.VoteOperation]) -> List[Tuple[str, int, int]]:
+    """
+    Apply many votes in one transaction: one UPDATE ... FROM (VALUES ...) RETURNING per
+    entity type, with repeated (entity_type, id) operations summed first. Returns
+    (entity_type, id, vote_score) in the order the entities first appear. If any id
+    doesn't exist nothing is applied and LookupError names the missing ids.
+    """
+    entities = list(dict.fromkeys((operation.entity_type, operation.id) for operation in operations))
+    deltas: Dict[str, Dict[int, int]] = {}
+    for operation in operations:
+        by_id = deltas.setdefault(operation.entity_type, {})
+        by_id[operation.id] = by_id.get(operation.id, 0) + operation.delta
+
+    scores: Dict[Tuple[str, int], int] = {}
+    for entity_type, model in VOTE_MODELS.items():
+        if entity_type not in deltas:
+            continue
+        changes = _id_values(deltas[entity_type].items(), "vote_deltas", "delta")
+        rows = db.execute(
+            update(model)
+            .where(model.id == changes.c.id)
+            .values(vote_score=func.coalesce(model.vote_score, 0) + changes.c.delta)
+            .returning(model.id, model.vote_score)
+            .execution_options(synchronize_session=False)
+        ).all()
+        scores.update(((entity_type, row.id), row.vote_score) for row in rows)
+        if entity_type == "deal" and rows:
+            _set_card_vote_counts(db, [(row.id, row.vote_score) for row in rows])
+
+    missing = [entity for entity in entities if entity not in scores]
+    if missing:
+        db.rollback()
+        raise LookupError("Not found: " + ", ".join(f"{entity_type} {entity_id}" for entity_type, entity_id in missing))
+    db.commit()
+    return [(entity_type, entity_id, scores[entity_type, entity_id]) for entity_type, entity_id in entities]
+
+
+# Enriched deal read path
+# Only the columns rendered into deal cards and search results, fetched in one joined query
+ENRICHED_DEAL_COLUMNS = (
+    models.Deal.id,
+    models.Deal.business_id,
+    models.Deal.deal_type,
+    models.Deal.days_active,
+    models.Deal.time_start,
+    models.Deal.time_end,
+    models.Deal.description,
+    models.Deal.food_items,
+    models.Deal.drink_items,
+    models.Deal.pricing,
+    models.Deal.tags,
+    models.Deal.image_url,
+    models.Deal.created_by,
+    models.Deal.created_at,
+    models.Deal.vote_score,
+    models.Business.name.label("business_name"),
+    models.Business.address,
+    models.Business.phone,
+    models.Business.google_place_id,
+    models.Business.website,
+    models.Business.latitude,
+    models.Business.longitude,
+)
+
+
+def _enriched_deals_query(db: Optional[Session]):
+    """db may be None when only the statement is needed"""
+    return Query(ENRICHED_DEAL_COLUMNS, db).join(
+        models.Business, models.Deal.business_id == models.Business.id
+    )
+
+
+# Deal cards: the enriched shape stored per deal (models.DealCard), so listings serve
+# stored JSON text without per-row work. Every write that changes a card re-renders it.
+DEAL_CARD_SORT_KEY = (models.DealCard.deal_id,)
+CARD_REFRESH_BATCH_SIZE = 1000
+
+
+def _card_values(row) -> dict:
+    # Stored at the card's own (possibly fallback) location, so map filters find every card
+    lat, lng = cards.card_location(row)
+    return {"deal_id": row.id, "business_id": row.business_id, "latitude": lat, "longitude": lng,
+            "card": cards.enrich_deal(row)}
+
+
+def refresh_deal_cards(db, condition, batch_size: int = CARD_REFRESH_BATCH_SIZE) -> int:
+    """
+    Re-render and upsert the stored cards of every deal matching condition (a filter on
+    deals/businesses), in batches. Works on a Session or a Connection; doesn't commit.
+    Returns the number of cards written.
+    """
+    written, last_id = 0, 0
+    while True:
+        rows = db.execute(
+            select(*ENRICHED_DEAL_COLUMNS)
+            .join(models.Business, models.Deal.business_id == models.Business.id)
+            .where(condition, models.Deal.id > last_id)
+            .order_by(models.Deal.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            return written
+        stmt = postgresql.insert(models.DealCard).values([_card_values(row) for row in rows])
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=["deal_id"],
+            set_={column: stmt.excluded[column] for column in ("business_id", "latitude", "longitude", "card")},
+        ))
+        written += len(rows)
+        last_id = rows[-1].id
+
+
+def _set_card_vote_count(db: Session, deal_id: int, vote_score: int):
+    """Votes are the hottest write; patch the stored card's count rather than re-render it"""
+    db.execute(
+        update(models.DealCard)
+        .where(models.DealCard.deal_id == deal_id)
+        .values(card=func.jsonb_set(models.DealCard.card, literal_column("'{vote_count}'::text[]"),
+                                    func.to_jsonb(vote_score)))
+    )
+
+
+def _set_card_vote_counts(db: Session, vote_scores: List[Tuple[int, int]]):
+    """_set_card_vote_count for many deals in one statement"""
+    scores = _id_values(vote_scores, "card_scores", "vote_score")
+    db.execute(
+        update(models.DealCard)
+        .where(models.DealCard.deal_id == scores.c.id)
+        .values(card=func.jsonb_set(models.DealCard.card, literal_column("'{vote_count}'::text[]"),
+                                    func.to_jsonb(scores.c.vote_score)))
+    )
+
+
+# Stored cards are read as JSON text plus their image_url, for cards.serve_card
+CARD_IMAGE_URL = models.DealCard.card["image_url"].astext.label("image_url")
+
+
+def get_deal_card(db: Session, deal_id: int):
+    """A deal's stored card as a (card JSON text, image_url) row, or None"""
+    return db.execute(
+        select(cast(models.DealCard.card, Text).label("card"), CARD_IMAGE_URL)
+        .where(models.DealCard.deal_id == deal_id)
+    ).first()
+
+
+def _filter_bbox(query, bbox: Optional[Tuple[float, float, float, float]]):
+    if bbox is None:
+        return query
+    min_lat, min_lng, max_lat, max_lng = bbox
+    return query.filter(
+        models.DealCard.latitude.between(min_lat, max_lat),
+        models.DealCard.longitude.between(min_lng, max_lng),
+    )
+
+
+def _near_distance(near: Tuple[float, float, float]):
+    """(distance in meters, radius filter) for a (lat, lng, radius_m) search"""
+    lat, lng, radius_m = near
+    center = func.ll_to_earth(lat, lng)
+    # Must match the ix_deal_cards_earth_point expression for the GiST index to apply
+    point = func.ll_to_earth(models.DealCard.latitude, models.DealCard.longitude)
+    distance = func.earth_distance(center, point)
+    return distance, and_(func.earth_box(center, radius_m).op("@>")(point), distance <= radius_m)
+
+
+def deal_card_sort_key(sort: Optional[str]):
+    """Keyset columns of get_deal_cards rows for a ?sort= ranking (descending), or the default order"""
+    return DEAL_RANKINGS[sort] if sort else DEAL_CARD_SORT_KEY
+
+
+def _deal_cards_page(db: Optional[Session], skip: int = 0, limit: int = 100, ids: Optional[List[int]] = None,
+                     active_minute: Optional[int] = None,
+                     bbox: Optional[Tuple[float, float, float, float]] = None,
+                     near: Optional[Tuple[float, float, float]] = None, cursor: Optional[str] = None,
+                     sort: Optional[str] = None):
+    """db may be None when only the statement is needed"""
+    if near is not None and sort is not None:
+        raise ValueError("sort is not supported with near, which orders by distance")
+    if near is None:
+        card = models.DealCard.card
+    else:
+        if cursor:
+            # Distance isn't a stable keyset column; radius searches are bounded anyway
+            raise ValueError("cursor pagination is not supported with near")
+        distance, within_radius = _near_distance(near)
+        card = models.DealCard.card.op("||")(func.jsonb_build_object("distance_m", cast(func.round(distance), Integer)))
+    sort_key = deal_card_sort_key(sort)
+    query = Query((models.DealCard.deal_id, cast(card, Text).label("card"), CARD_IMAGE_URL), db)
+    if sort is not None:
+        # Rank on the deals index; the sort columns ride along for the next cursor
+        query = query.join(models.Deal, models.Deal.id == models.DealCard.deal_id).add_columns(*sort_key)
+    if ids:
+        query = query.filter(models.DealCard.deal_id.in_(ids))
+    query = _filter_active_at(query, active_minute, models.DealCard.deal_id)
+    query = _filter_bbox(query, bbox)
+    if near is not None:
+        query = query.filter(within_radius).order_by(distance)
+    return _paged(query, sort_key, skip, limit, cursor, descending=sort is not None)
+
+
+def get_deal_cards(db: Session, **filters):
+    """Stored cards as (deal_id, card JSON text, image_url) rows; filters as for _deal_cards_page"""
+    return _deal_cards_page(db, **filters).all()
+
+
+def deal_cards_statement(**filters):
+    """The get_deal_cards query as a Core statement, for streaming it from a server-side cursor"""
+    return _deal_cards_page(None, **filters).statement
+
+
+def search_deals(db: Session, q: Optional[str] = None, tags: Optional[List[str]] = None, limit: int = 20,
+                 cursor: Optional[str] = None) -> Tuple[list, Optional[str]]:
+    """
+    Enriched deals matching a web-style query (quoted phrases, OR, -word) and/or containing
+    all the given tags, best match first. Returns (rows, cursor for the next page).
+    """
+    if not q and not tags:
+        raise ValueError("q or tags is required")
+    query = _enriched_deals_query(db)
+    if tags:
+        # Cast to the column's varchar[] so the comparison can use ix_deals_tags
+        query = query.filter(models.Deal.tags.op("@>")(cast(tags, models.Deal.tags.type)))
+    if q:
+        ts_query = func.websearch_to_tsquery("english", q)
+        # double precision so the rank round-trips through the cursor exactly
+        rank = cast(func.ts_rank(models.Deal.search_vector, ts_query), Float).label("rank")
+        query = query.add_columns(rank).filter(models.Deal.search_vector.op("@@")(ts_query))
+        sort_key = (rank, models.Deal.id)
+    else:
+        sort_key = (models.Deal.id,)
+    rows = pagination.keyset_paginate(query, sort_key, cursor, descending=True).limit(limit).all()
+    return rows, pagination.next_cursor(rows, limit, sort_key)
+
+
+# Table version counters for ETags
+# Each table has a <table>_version_seq sequence; sequences are lock-free and shared by all workers
+VERSIONED_TABLES = ("businesses", "deals", "comments")
+
+
+def get_table_versions(db: Session, tables) -> dict:
+    # A fresh sequence reports last_value 1 both before and after its first nextval();
+    # only is_called changes, so count an unused sequence as 0
+    columns = [f"(SELECT CASE WHEN is_called THEN last_value ELSE 0 END FROM {table}_version_seq) AS {table}"
+               for table in tables]
+    if db.info.get("replica"):
+        # A standby's sequences only move every 32 nextval() calls (they're WAL-logged
+        # ahead), so there a version also includes how much WAL has been replayed
+        columns.append("pg_last_wal_replay_lsn()::text AS replayed")
+    row = db.execute(text(f"SELECT {', '.join(columns)}")).one()
+    return dict(row._mapping)
+
+
+def bump_table_versions(db: Session, tables, notifications: List[Tuple[str, str]] = ()) -> str:
+    """
+    Call after a write has committed, so readers never see a new version with old data.
+    nextval() takes effect immediately, so no commit is needed. (channel, payload)
+    notifications go out with NOTIFY in the same statement; those are only delivered
+    on commit, so then the transaction is committed. Returns the primary's WAL insert
+    position, which is past the write's commit record, for read-your-writes routing (see
+    database.py). pg_current_wal_lsn() is only the write position, which can lag behind
+    a commit still sitting in the WAL buffers (with synchronous_commit off, say).
+    """
+    calls = ["pg_current_wal_insert_lsn()::text"] + [f"nextval('{table}_version_seq')" for table in tables]
+    params = {}
+    for i, (channel, payload) in enumerate(notifications):
+        calls.append(f"pg_notify(:channel_{i}, :payload_{i})")
+        params[f"channel_{i}"], params[f"payload_{i}"] = channel, payload
+    lsn = db.execute(text(f"SELECT {', '.join(calls)}"), params).scalar()
+    if notifications:
+        # Only the NOTIFYs need committing; keep the route's loaded objects loaded for its response
+        expire_on_commit, db.expire_on_commit = db.expire_on_commit, False
+        try:
+            db.commit()
+        finally:
+            db.expire_on_commit = expire_on_commit
+    return lsn
+
+
+# Bulk import
+BUSINESS_FIELDS = ("address", "phone", "website", "latitude", "longitude")
+DEAL_FIELDS = tuple(schemas.DealBase.model_fields)
+MAX_REPORTED_ERRORS = 1000
+
+
+def _record_error(result: schemas.BulkImportResult, row: int, error: str):
+    result.error_count += 1
+    if len(result.errors) < MAX_REPORTED_ERRORS:
+        result.errors.append(schemas.BulkRowError(row=row, error=error))
+
+
+def _upsert_businesses(db: Session, rows: List[schemas.BulkDealRow]) -> dict:
+    """Insert or update the batch's businesses by google_place_id; returns place id -> business id"""
+    by_place_id = {}
+    for row in rows:
+        by_place_id[row.google_place_id] = {
+            "name": row.business_name,
+            "google_place_id": row.google_place_id,
+            "created_by": row.created_by,
+            "vote_score": 0,
+            **{field: getattr(row, field) for field in BUSINESS_FIELDS},
+        }
+    stmt = postgresql.insert(models.Business).values(list(by_place_id.values()))
+    # Keep existing details where the import leaves a field blank
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["google_place_id"],
+        set_={
+            "name": stmt.excluded.name,
+            **{field: func.coalesce(stmt.excluded[field], models.Business.__table__.c[field])
+               for field in BUSINESS_FIELDS},
+        },
+    ).returning(models.Business.id, models.Business.google_place_id)
+    return {place_id: business_id for business_id, place_id in db.execute(stmt)}
+
+
+def _insert_deals(db: Session, rows: List[schemas.BulkDealRow], business_ids: dict) -> int:
+    """Batched INSERT ... RETURNING for deals, plus their schedule windows"""
+    params = [
+        {
+            "business_id": business_ids[row.google_place_id],
+            "created_by": row.created_by,
+            "vote_score": 0,
+            **{field: getattr(row, field) for field in DEAL_FIELDS},
+        }
+        for row in rows
+    ]
+    stmt = insert(models.Deal).returning(models.Deal.id, sort_by_parameter_order=True)
+    deal_ids = db.execute(stmt, params).scalars().all()
+
+    windows = [
+        {"deal_id": deal_id, "minutes": window}
+        for deal_id, row in zip(deal_ids, rows)
+        for window in schedule.compute_schedule_windows(row.days_active, row.time_start, row.time_end)
+    ]
+    if windows:
+        db.execute(insert(models.DealScheduleWindow), windows)
+    return len(deal_ids)
+
+
+def _import_valid_rows(db: Session, rows: List[schemas.BulkDealRow]) -> Tuple[int, int]:
+    """Returns (businesses upserted, deals created)"""
+    business_ids = _upsert_businesses(db, rows)
+    deals_created = _insert_deals(db, rows, business_ids)
+    # Upserts can change existing businesses, so re-render every card of the batch's businesses
+    refresh_deal_cards(db, models.Deal.business_id.in_(list(business_ids.values())))
+    return len(business_ids), deals_created
+
+
+def bulk_import_deals(db: Session, batch, result: schemas.BulkImportResult):
+    """
+    Validate and write one batch of parsed rows ((row_number, raw dict or bulk.ParseError)).
+    The batch is written with one upsert and one multi-row insert. If the database rejects
+    it, each row is retried in its own savepoint, so one bad row doesn't sink the rest.
+    """
+    valid = []
+    for row_number, raw in batch:
+        result.rows += 1
+        if isinstance(raw, str):
+            _record_error(result, row_number, raw)
+            continue
+        try:
+            valid.append((row_number, schemas.BulkDealRow.model_validate(raw)))
+        except ValidationError as e:
+            _record_error(result, row_number, "; ".join(
+                f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors()
+            ))
+    if not valid:
+        return
+
+    try:
+        with db.begin_nested():
+            written = [_import_valid_rows(db, [row for _, row in valid])]
+    except DBAPIError:
+        written = []
+        for row_number, row in valid:
+            try:
+                with db.begin_nested():
+                    written.append(_import_valid_rows(db, [row]))
+            except DBAPIError as e:
+                _record_error(result, row_number, str(e.orig).strip().splitlines()[0])
+    db.commit()
+    result.businesses_upserted += sum(businesses for businesses, _ in written)
+    result.deals_created += sum(deals for _, deals in written)
@@ -1,22 +1,194 @@
-from sqlalchemy import create_engine
+from contextvars import ContextVar
+from typing import List, Optional
+from fastapi import Request
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from starlette.concurrency import iterate_in_threadpool, run_in_threadpool
+from starlette.datastructures import MutableHeaders
 from dotenv import load_dotenv
 import os
+import re
+
+from app import metrics, pool
 
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
+# Serve requests on an asyncpg AsyncSession instead of psycopg2 in the threadpool
+DB_ASYNC = os.getenv("DB_ASYNC", "false").lower() in ("1", "true", "yes")
+# Optional streaming replica for GET requests; writes always go to DATABASE_URL
+DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL") or None
+# How long after a write a client's reads wait for the replica to catch up with it
+REPLICA_STICKY_SECONDS = int(os.getenv("REPLICA_STICKY_SECONDS", "30"))
 
-engine = create_engine(DATABASE_URL)
+engine = create_engine(DATABASE_URL, **pool.engine_options())
+pool.instrument(engine)
+metrics.instrument_engine(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+if DATABASE_REPLICA_URL:
+    replica_engine = create_engine(DATABASE_REPLICA_URL, **pool.engine_options())
+    pool.instrument(replica_engine)
+    metrics.instrument_engine(replica_engine)
+    # info["replica"] tells crud and the routes which side a session reads from
+    ReplicaSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine,
+                                       info={"replica": True})
+
 Base = declarative_base()
 
-def get_db():
+
+def to_async_url(url: str) -> str:
+    """postgresql://... -> postgresql+asyncpg://..."""
+    scheme, rest = url.split("://", 1)
+    return f"{scheme.split('+')[0]}+asyncpg://{rest}"
+
+
+if DB_ASYNC:
+    async_engine = create_async_engine(to_async_url(DATABASE_URL), **pool.engine_options(is_async=True))
+    pool.instrument(async_engine.sync_engine)
+    metrics.instrument_engine(async_engine.sync_engine)
+    # Objects stay loaded after commit so routes can serialize them without lazy IO
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+    if DATABASE_REPLICA_URL:
+        async_replica_engine = create_async_engine(to_async_url(DATABASE_REPLICA_URL),
+                                                   **pool.engine_options(is_async=True))
+        pool.instrument(async_replica_engine.sync_engine)
+        metrics.instrument_engine(async_replica_engine.sync_engine)
+        AsyncReplicaSessionLocal = async_sessionmaker(async_replica_engine, autoflush=False,
+                                                      expire_on_commit=False, info={"replica": True})
+
+
+# Read-your-writes: a response to a write carries the primary's WAL position (LSN) after
+# it, as the X-DB-LSN header and a short-lived cookie. A GET sent back with either is
+# only served by the replica once it has replayed that far; until then, by the primary.
+LSN_HEADER = "X-DB-LSN"
+LSN_COOKIE = "db_lsn"
+LSN_PATTERN = re.compile(r"^[0-9A-Fa-f]{1,8}/[0-9A-Fa-f]{1,8}$")
+READ_METHODS = ("GET", "HEAD")
+# NULL on a server that isn't replaying WAL (e.g. a replica URL pointing at the primary)
+REPLICA_CAUGHT_UP = text("SELECT coalesce(pg_last_wal_replay_lsn() >= CAST(:lsn AS pg_lsn), true)")
+
+_written_lsns: ContextVar[Optional[List[str]]] = ContextVar("written_lsns", default=None)
+
+
+def is_replica(db) -> bool:
+    return db.info.get("replica", False)
+
+
+def reads_from_replica(request: Request) -> bool:
+    return DATABASE_REPLICA_URL is not None and request.method in READ_METHODS
+
+
+def client_lsn(request: Request) -> Optional[str]:
+    """The WAL position of the client's latest write, if it sent a valid one"""
+    lsn = request.headers.get(LSN_HEADER) or request.cookies.get(LSN_COOKIE)
+    return lsn if lsn and LSN_PATTERN.match(lsn) else None
+
+
+def remember_write(lsn: Optional[str]):
+    """Record a committed write's WAL position for ReadYourWritesMiddleware to hand back"""
+    written = _written_lsns.get()
+    if written is not None and lsn:
+        written.append(lsn)
+
+
+class ReadYourWritesMiddleware:
+    """ASGI middleware adding the X-DB-LSN header and cookie to responses to writes"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        written: List[str] = []
+        token = _written_lsns.set(written)
+
+        async def send_with_lsn(message):
+            if message["type"] == "http.response.start" and written:
+                headers = MutableHeaders(scope=message)
+                headers.append(LSN_HEADER, written[-1])
+                headers.append("Set-Cookie", f"{LSN_COOKIE}={written[-1]}; Max-Age={REPLICA_STICKY_SECONDS}; "
+                                             "Path=/; HttpOnly; SameSite=Lax")
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_lsn)
+        finally:
+            _written_lsns.reset(token)
+
+
+def _open_session(request: Request):
+    """A replica session for reads the replica can serve, else a primary session"""
+    if not reads_from_replica(request):
+        return SessionLocal()
+    db = ReplicaSessionLocal()
+    lsn = client_lsn(request)
+    if lsn is None or db.execute(REPLICA_CAUGHT_UP, {"lsn": lsn}).scalar():
+        return db
+    db.close()
+    return SessionLocal()
+
+
+async def _open_async_session(request: Request):
+    if not reads_from_replica(request):
+        return AsyncSessionLocal()
+    db = AsyncReplicaSessionLocal()
+    lsn = client_lsn(request)
+    if lsn is None or (await db.execute(REPLICA_CAUGHT_UP, {"lsn": lsn})).scalar():
+        return db
+    await db.close()
+    return AsyncSessionLocal()
+
+
+def get_db(request: Request):
     """Dependency for getting database session"""
-    db = SessionLocal()
+    db = _open_session(request)
     try:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db(request: Request):
+    """Dependency for getting an async database session (DB_ASYNC mode)"""
+    async with await _open_async_session(request) as db:
+        yield db
+
+
+# Session dependency used by the routes, selected by DB_ASYNC
+get_session = get_async_db if DB_ASYNC else get_db
+
+
+async def run_db(db, fn, *args, **kwargs):
+    """
+    Run a crud function against either kind of session without blocking the event loop.
+    AsyncSessions run it via run_sync on the asyncpg connection; sync Sessions run it
+    in the threadpool, as the previous sync routes did.
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(fn, db, *args, **kwargs)
+
+
+async def stream_partitions(statement, size: int, replica: bool = False):
+    """
+    Yield a statement's rows in lists of up to `size`, fetched from a server-side cursor.
+    Uses a session of its own: the request's session is closed before a streamed body
+    is sent. replica=True reads from the replica, as the request's session did.
+    """
+    statement = statement.execution_options(stream_results=True)
+    if DB_ASYNC:
+        async with (AsyncReplicaSessionLocal if replica else AsyncSessionLocal)() as db:
+            result = await db.stream(statement)
+            async for rows in result.partitions(size):
+                yield rows
+    else:
+        with (ReplicaSessionLocal if replica else SessionLocal)() as db:
+            result = await run_in_threadpool(db.execute, statement)
+            async for rows in iterate_in_threadpool(result.partitions(size)):
+                yield rows
@@ -0,0 +1,31 @@
+import hashlib
+import os
+from typing import Dict, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Cache-Control sent with ETagged GET responses; clients and nginx revalidate after max-age
+READ_CACHE_MAX_AGE = int(os.getenv("READ_CACHE_MAX_AGE", "0"))
+
+
+def cache_control() -> str:
+    return f"public, max-age={READ_CACHE_MAX_AGE}, must-revalidate"
+
+
+def make_etag(path: str, query: str, versions: Dict[str, int]) -> str:
+    """Strong ETag for a GET: same URL and same table versions means the same body"""
+    key = "|".join([path, query] + [f"{table}={versions[table]}" for table in sorted(versions)])
+    return '"' + hashlib.sha1(key.encode()).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """True if an If-None-Match header matches etag (weak comparison, per RFC 9110)"""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
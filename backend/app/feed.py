@@ -0,0 +1,187 @@
+"""
+Live update feed: small JSON events pushed to Server-Sent Events subscribers.
+
+Write routes publish events with NOTIFY on FEED_CHANNEL in the same round trip that
+bumps table versions (see main.record_write), so every worker sees every write. Each
+worker holds one LISTEN connection and fans each event, encoded once, out to its
+subscribers. A subscriber's queue holds at most FEED_QUEUE_SIZE events. One that
+falls further behind, because its client reads slowly and send() is blocking, loses
+its backlog and gets a single "resync" event instead. Idle subscribers cost an
+empty deque and a parked coroutine.
+
+Events:
+    deal_created     {"deal_id", "business_id"}
+    comment_created  {"comment_id", "deal_id", "business_id"}
+    vote             {"entity_type", "id", "vote_score"}
+    resync           {} - events may have been missed; refetch what's on screen
+"""
+import asyncio
+import json
+import logging
+import os
+from collections import deque
+from typing import AsyncIterator, List, Optional, Set, Tuple
+
+import asyncpg
+from dotenv import load_dotenv
+
+load_dotenv()
+
+FEED_CHANNEL = "live_events"
+FEED_QUEUE_SIZE = int(os.getenv("FEED_QUEUE_SIZE", "100"))  # events buffered per subscriber
+FEED_MAX_SUBSCRIBERS = int(os.getenv("FEED_MAX_SUBSCRIBERS", "5000"))  # per worker
+FEED_HEARTBEAT_SECONDS = float(os.getenv("FEED_HEARTBEAT_SECONDS", "15"))
+FEED_RETRY_MS = 5000  # client reconnect delay
+# LISTEN needs a session of its own; point this past a transaction-mode PgBouncer
+FEED_DATABASE_URL = os.getenv("FEED_DATABASE_URL") or os.getenv("DATABASE_URL")
+
+HEARTBEAT = b": keepalive\n\n"
+
+logger = logging.getLogger("app.feed")
+
+
+def encode(event: dict) -> str:
+    """An event as a NOTIFY payload (Postgres caps these at 8000 bytes)"""
+    return json.dumps(event, separators=(",", ":"))
+
+
+def notifications(events: List[dict]) -> List[Tuple[str, str]]:
+    """(channel, payload) pairs for crud.bump_table_versions"""
+    return [(FEED_CHANNEL, encode(event)) for event in events]
+
+
+def _message(event_type: str, data: str) -> bytes:
+    return f"event: {event_type}\ndata: {data}\n\n".encode()
+
+
+RESYNC = _message("resync", "{}")
+
+
+class Subscriber:
+    """One SSE connection's pending messages"""
+
+    __slots__ = ("_queue", "_ready")
+
+    def __init__(self):
+        self._queue: deque = deque()
+        self._ready = asyncio.Event()
+
+    def offer(self, message: bytes):
+        if len(self._queue) >= FEED_QUEUE_SIZE:
+            # Too far behind to catch up event by event
+            self._queue.clear()
+            message = RESYNC
+        self._queue.append(message)
+        self._ready.set()
+
+    async def next_chunk(self, timeout: float) -> Optional[bytes]:
+        """Everything queued, joined; None if nothing arrived within timeout"""
+        if not self._queue:
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        messages = list(self._queue)
+        self._queue.clear()
+        return b"".join(messages)
+
+
+class Broker:
+    """This worker's subscribers and its LISTEN connection, started with the first subscriber"""
+
+    def __init__(self):
+        self._subscribers: Set[Subscriber] = set()
+        self._listener: Optional[asyncio.Task] = None
+        self.events_received = 0
+        self.resyncs_sent = 0
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    @property
+    def full(self) -> bool:
+        return len(self._subscribers) >= FEED_MAX_SUBSCRIBERS
+
+    async def stream(self) -> AsyncIterator[bytes]:
+        """
+        SSE body for a new subscriber; heartbeats keep proxies from closing idle streams.
+        Subscribes on first iteration, so a response that never starts leaves nothing behind.
+        """
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+        subscriber = Subscriber()
+        self._subscribers.add(subscriber)
+        try:
+            yield f"retry: {FEED_RETRY_MS}\n\n".encode()
+            while True:
+                chunk = await subscriber.next_chunk(FEED_HEARTBEAT_SECONDS)
+                yield HEARTBEAT if chunk is None else chunk
+        finally:
+            self._subscribers.discard(subscriber)
+
+    def _broadcast(self, message: bytes):
+        for subscriber in self._subscribers:
+            subscriber.offer(message)
+
+    def _on_notify(self, connection, pid, channel, payload: str):
+        self.events_received += 1
+        try:
+            event_type = json.loads(payload)["type"]
+        except (ValueError, KeyError, TypeError):
+            logger.warning("Ignoring malformed feed event: %r", payload)
+            return
+        self._broadcast(_message(event_type, payload))
+
+    async def _listen(self):
+        """Hold a LISTEN connection, reconnecting with backoff; runs until close()"""
+        delay = 1.0
+        connected_before = False
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(_asyncpg_dsn(FEED_DATABASE_URL))
+                await connection.add_listener(FEED_CHANNEL, self._on_notify)
+                if connected_before:
+                    # Anything published while we were disconnected is lost
+                    self.resyncs_sent += 1
+                    self._broadcast(RESYNC)
+                connected_before = True
+                delay = 1.0
+                while True:
+                    # A query notices a silently dropped connection
+                    await asyncio.sleep(FEED_HEARTBEAT_SECONDS)
+                    await connection.fetchval("SELECT 1")
+            except Exception as e:
+                logger.warning("Feed listener disconnected (%s); reconnecting in %.0fs", e, delay)
+            finally:
+                if connection is not None:
+                    await _close_quietly(connection)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30.0)
+
+    async def close(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+
+async def _close_quietly(connection):
+    try:
+        await connection.close(timeout=5)
+    except Exception:
+        connection.terminate()
+
+
+def _asyncpg_dsn(url: str) -> str:
+    """postgresql+psycopg2://... -> postgresql://..., which asyncpg accepts"""
+    scheme, rest = url.split("://", 1)
+    return f"{scheme.split('+')[0]}://{rest}"
+
+
+broker = Broker()
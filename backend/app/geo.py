@@ -0,0 +1,38 @@
+from typing import Tuple
+
+# Upper bound on radius searches so a typo can't turn into a full-table scan
+MAX_RADIUS_M = 50_000
+
+
+def _parse_floats(value: str, count: int, name: str) -> Tuple[float, ...]:
+    parts = value.split(",")
+    if len(parts) != count:
+        raise ValueError(f"{name} must have {count} comma-separated numbers")
+    try:
+        return tuple(float(part) for part in parts)
+    except ValueError:
+        raise ValueError(f"{name} must have {count} comma-separated numbers")
+
+
+def _check_latlng(lat: float, lng: float, name: str):
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        raise ValueError(f"{name} is outside valid latitude/longitude bounds")
+
+
+def parse_bbox(value: str) -> Tuple[float, float, float, float]:
+    """Parse a viewport 'south,west,north,east' string into (min_lat, min_lng, max_lat, max_lng)"""
+    south, west, north, east = _parse_floats(value, 4, "bbox")
+    _check_latlng(south, west, "bbox")
+    _check_latlng(north, east, "bbox")
+    if south > north or west > east:
+        raise ValueError("bbox must be ordered south,west,north,east")
+    return south, west, north, east
+
+
+def parse_near(value: str, radius_m: float) -> Tuple[float, float, float]:
+    """Parse 'lat,lng' plus a radius in meters into (lat, lng, radius_m)"""
+    lat, lng = _parse_floats(value, 2, "near")
+    _check_latlng(lat, lng, "near")
+    if not 0 < radius_m <= MAX_RADIUS_M:
+        raise ValueError(f"radius_m must be between 0 and {MAX_RADIUS_M}")
+    return lat, lng, radius_m
@@ -0,0 +1,270 @@
+"""
+Resized deal image variants: thumb/card/hero widths in WebP and JPEG.
+
+Variant filenames carry a hash of the source image's bytes, so a URL always names the
+same pixels and is served with a year-long immutable Cache-Control; a changed source
+gets new URLs. Variants are rendered by a process pool (Pillow work is CPU-bound and
+would hold the GIL) and written to IMAGE_CACHE_DIR.
+
+The pool starts with the app, which then scans the source images every
+IMAGE_SCAN_SECONDS (off the event loop), queuing renders for new or changed ones and
+keeping an image_url -> srcset map, so serving a card only looks its srcset up. GET
+/images/{filename} renders a missing variant on demand, and a name whose source has
+since changed redirects to the current variant.
+
+Only images in IMAGE_SOURCE_DIR (the frontend's public/ directory, whose files deal
+image_urls like "/fresh-oysters-on-ice-with-lemon.jpg" point at) get variants; other
+URLs are served as they are.
+"""
+import asyncio
+import hashlib
+import logging
+import multiprocessing
+import os
+import re
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Dict, Optional, Set, Tuple
+
+import orjson
+from dotenv import load_dotenv
+from starlette.concurrency import run_in_threadpool
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IMAGE_SOURCE_DIR = os.getenv("IMAGE_SOURCE_DIR") or os.path.join(BACKEND_DIR, os.pardir, "frontend", "public")
+IMAGE_CACHE_DIR = os.getenv("IMAGE_CACHE_DIR") or os.path.join(BACKEND_DIR, "var", "images")
+IMAGE_BASE_URL = os.getenv("IMAGE_BASE_URL", "/api/images")  # where clients reach GET /images/
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", "2"))  # render processes per server worker
+IMAGE_SCAN_SECONDS = float(os.getenv("IMAGE_SCAN_SECONDS", "60"))  # how soon a replaced image is picked up
+
+# Variant name -> width in pixels (never upscaled)
+VARIANTS = {"thumb": 160, "card": 480, "hero": 1200}
+FORMATS = {"webp": "webp", "jpeg": "jpg"}  # format -> file extension
+FORMAT_OF_EXTENSION = {extension: fmt for fmt, extension in FORMATS.items()}
+SOURCE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp")
+WEBP_QUALITY = 80
+JPEG_QUALITY = 82
+DIGEST_LENGTH = 16
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+VARIANT_FILENAME = re.compile(
+    rf"^(?P<stem>[A-Za-z0-9_.-]+?)-(?P<variant>{'|'.join(VARIANTS)})"
+    rf"-(?P<digest>[0-9a-f]{{{DIGEST_LENGTH}}})\.(?P<ext>{'|'.join(FORMATS.values())})$"
+)
+
+
+def variant_filename(stem: str, variant: str, digest: str, fmt: str) -> str:
+    return f"{stem}-{variant}-{digest}.{FORMATS[fmt]}"
+
+
+def render_variants(source_path: str, stem: str, digest: str, cache_dir: str):
+    """Write every variant of one source image. Runs in a pool process."""
+    from PIL import Image, ImageOps
+
+    os.makedirs(cache_dir, exist_ok=True)
+    with Image.open(source_path) as original:
+        image = ImageOps.exif_transpose(original).convert("RGB")
+    for variant, width in VARIANTS.items():
+        resized = image
+        if image.width > width:
+            resized = image.resize((width, round(image.height * width / image.width)), Image.LANCZOS)
+        for fmt in FORMATS:
+            path = os.path.join(cache_dir, variant_filename(stem, variant, digest, fmt))
+            if os.path.exists(path):
+                continue
+            # Write then rename, so a concurrent reader never sees a partial file
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            if fmt == "webp":
+                resized.save(tmp_path, "WEBP", quality=WEBP_QUALITY, method=4)
+            else:
+                resized.save(tmp_path, "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+            os.replace(tmp_path, path)
+
+
+class VariantRenderer:
+    """This process's render pool, source digests, in-flight renders and srcsets"""
+
+    def __init__(self, source_dir: str, cache_dir: str, workers: int):
+        self.source_dir = os.path.realpath(source_dir)
+        self.cache_dir = cache_dir
+        self.workers = workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._digests: Dict[str, Tuple[int, int, str]] = {}  # path -> (mtime_ns, size, digest)
+        self._pending: Dict[str, Future] = {}  # digest -> render
+        self._rendered: Set[str] = set()  # digests whose variants are all on disk
+        # image_url -> (srcset, srcset as JSON text), replaced whole by each scan
+        self._srcsets: Dict[str, Tuple[dict, str]] = {}
+        self._scanner: Optional[asyncio.Task] = None
+
+    def source_path(self, image_url: Optional[str]) -> Optional[str]:
+        """The local source file an image_url points at, if it's one we resize"""
+        if not image_url or not image_url.startswith("/") or "/" in image_url[1:] or "?" in image_url:
+            return None
+        if not image_url.lower().endswith(SOURCE_EXTENSIONS):
+            return None
+        path = os.path.join(self.source_dir, image_url[1:])
+        return path if os.path.isfile(path) else None
+
+    def digest(self, path: str) -> str:
+        """Content hash of a source file, recomputed only when its mtime or size changes"""
+        stat = os.stat(path)
+        with self._lock:
+            cached = self._digests.get(path)
+        if cached and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            return cached[2]
+        with open(path, "rb") as f:
+            digest = hashlib.sha256(f.read()).hexdigest()[:DIGEST_LENGTH]
+        with self._lock:
+            self._digests[path] = (stat.st_mtime_ns, stat.st_size, digest)
+        return digest
+
+    def _is_rendered(self, stem: str, digest: str) -> bool:
+        return all(os.path.exists(os.path.join(self.cache_dir, variant_filename(stem, variant, digest, fmt)))
+                   for variant in VARIANTS for fmt in FORMATS)
+
+    def ensure(self, path: str, stem: str, digest: str) -> Optional[Future]:
+        """Queue a source's variants unless they exist; returns the render to wait on, if any"""
+        with self._lock:
+            if digest in self._rendered:
+                return None
+            future = self._pending.get(digest)
+            if future is not None:
+                return future
+        if self._is_rendered(stem, digest):
+            with self._lock:
+                self._rendered.add(digest)
+            return None
+        with self._lock:
+            future = self._pending.get(digest)
+            if future is None:
+                if self._executor is None:
+                    raise RuntimeError("the render pool isn't running; call start() first")
+                future = self._executor.submit(render_variants, path, stem, digest, self.cache_dir)
+                self._pending[digest] = future
+                future.add_done_callback(lambda done: self._finished(digest, done))
+            return future
+
+    def _finished(self, digest: str, future: Future):
+        with self._lock:
+            self._pending.pop(digest, None)
+            if not future.cancelled() and future.exception() is None:
+                self._rendered.add(digest)
+
+    def scan(self):
+        """
+        Rebuild the srcset map from the source directory, queuing renders for new or
+        changed images. Blocking: sources are only re-hashed when their mtime or size
+        changes, but it still stats every file.
+        """
+        srcsets = {}
+        try:
+            names = os.listdir(self.source_dir)
+        except FileNotFoundError:
+            names = []
+        for name in names:
+            image_url = f"/{name}"
+            path = self.source_path(image_url)
+            if path is None:
+                continue
+            stem = os.path.splitext(name)[0]
+            digest = self.digest(path)
+            self.ensure(path, stem, digest)
+            srcset = {
+                fmt: ", ".join(f"{IMAGE_BASE_URL}/{variant_filename(stem, variant, digest, fmt)} {width}w"
+                               for variant, width in VARIANTS.items())
+                for fmt in FORMATS
+            }
+            srcsets[image_url] = (srcset, orjson.dumps(srcset).decode())
+        self._srcsets = srcsets
+
+    def srcset(self, image_url: Optional[str]) -> Optional[dict]:
+        """{"webp": srcset, "jpeg": srcset} for a local image as of the last scan; else None"""
+        entry = self._srcsets.get(image_url)
+        return entry[0] if entry else None
+
+    def srcset_json(self, image_url: Optional[str]) -> str:
+        """srcset() as JSON text"""
+        entry = self._srcsets.get(image_url)
+        return entry[1] if entry else "null"
+
+    async def start(self):
+        """Start the render pool, scan once, and keep rescanning in the background"""
+        # spawn: forking a server process with running threads isn't safe
+        self._executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+        await run_in_threadpool(self.scan)
+        self._scanner = asyncio.create_task(self._rescan())
+
+    async def _rescan(self):
+        while True:
+            await asyncio.sleep(IMAGE_SCAN_SECONDS)
+            try:
+                await run_in_threadpool(self.scan)
+            except Exception:
+                logger.exception("Scanning %s for deal images failed", self.source_dir)
+
+    def _source_for(self, stem: str) -> Optional[str]:
+        for extension in SOURCE_EXTENSIONS:
+            path = self.source_path(f"/{stem}{extension}")
+            if path is not None:
+                return path
+        return None
+
+    def render_for(self, filename: str) -> Optional[Future]:
+        """
+        The render producing a variant file that isn't on disk yet, or None if the name
+        doesn't match a current source image (unknown, or since replaced)
+        """
+        match = VARIANT_FILENAME.match(filename)
+        if match is None:
+            return None
+        path = self._source_for(match["stem"])
+        if path is None or self.digest(path) != match["digest"]:
+            return None
+        with self._lock:
+            # Asked for because it's missing, so don't trust an earlier check
+            self._rendered.discard(match["digest"])
+        future = self.ensure(path, match["stem"], match["digest"])
+        return future if future is not None else _done()
+
+    def current_filename(self, filename: str) -> Optional[str]:
+        """The same variant of a replaced source's current image, or None if there's no such source"""
+        match = VARIANT_FILENAME.match(filename)
+        if match is None:
+            return None
+        path = self._source_for(match["stem"])
+        if path is None:
+            return None
+        return variant_filename(match["stem"], match["variant"], self.digest(path), FORMAT_OF_EXTENSION[match["ext"]])
+
+    async def close(self):
+        if self._scanner is not None:
+            self._scanner.cancel()
+            try:
+                await self._scanner
+            except asyncio.CancelledError:
+                pass
+            self._scanner = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+def _done() -> Future:
+    future = Future()
+    future.set_result(None)
+    return future
+
+
+renderer = VariantRenderer(IMAGE_SOURCE_DIR, IMAGE_CACHE_DIR, IMAGE_WORKERS)
+
+
+def cached_path(filename: str) -> Optional[str]:
+    """Where a variant filename lives on disk, or None if it isn't a valid variant name"""
+    if VARIANT_FILENAME.match(filename) is None:
+        return None
+    return os.path.join(IMAGE_CACHE_DIR, filename)
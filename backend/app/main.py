@@ -1,31 +1,34 @@
-from fastapi import FastAPI, Depends, HTTPException
+from fastapi import FastAPI, Depends, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
-from typing import List, Optional
-
-from app import models, schemas, crud
-from app.database import engine, get_db
-
-# Default images for deals without custom images
-DEFAULT_IMAGES = [
-    "/craft-beer-bar-interior-with-taps.jpg",
-    "/cocktails-on-bar-with-lake-view.jpg",
-    "/fresh-oysters-on-ice-with-lemon.jpg",
-    "/wine-glasses-and-cheese-board-cozy-cafe.jpg",
-    "/street-tacos-with-margarita-mexican-food.jpg",
-    "/sushi-rolls-platter-fresh-fish.jpg",
-    "/giant-pizza-slice-new-york-style.jpg",
-    "/natural-wine-bottles-elegant-restaurant.jpg",
-]
-
-def get_default_image(deal_id: int) -> str:
-    """Return a consistent image for a deal based on its ID"""
-    return DEFAULT_IMAGES[deal_id % len(DEFAULT_IMAGES)]
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import FileResponse, ORJSONResponse, PlainTextResponse, RedirectResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from contextlib import asynccontextmanager
+import asyncio
+from typing import List, Literal, Optional
+from datetime import datetime
+import os
+
+from app import schemas, crud, schedule, geo, pagination, cache, etags, pool, bulk, cards, metrics, feed, images
+from app import database
+from app.database import get_session, run_db, stream_partitions
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await images.renderer.start()
+    yield
+    await feed.broker.close()
+    await images.renderer.close()
+    await deals_cache.close()
+
 
 app = FastAPI(
     title="Oakland Food Deals API",
     description="API for Oakland Food Deals - community-driven platform for time-sensitive food deals",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 
 # CORS middleware for local development
@@ -35,197 +38,509 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[pagination.NEXT_CURSOR_HEADER, "ETag", database.LSN_HEADER],
 )
 
+# With a read replica, responses to writes tell the client where its reads must catch up to
+if database.DATABASE_REPLICA_URL:
+    app.add_middleware(database.ReadYourWritesMiddleware)
+
+# Compress responses of at least GZIP_MINIMUM_SIZE bytes (0 disables). Behind nginx the
+# edge compresses instead, since it strips Accept-Encoding from proxied requests.
+GZIP_MINIMUM_SIZE = int(os.getenv("GZIP_MINIMUM_SIZE", "1000"))
+FEED_PATH = "/events"
+
+
+class FeedSkippingGZipMiddleware(GZipMiddleware):
+    """GZip everything but the live feed, whose events would sit in the compressor's buffer"""
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"] == FEED_PATH:
+            await self.app(scope, receive, send)
+        else:
+            await super().__call__(scope, receive, send)
+
+
+if GZIP_MINIMUM_SIZE:
+    app.add_middleware(FeedSkippingGZipMiddleware, minimum_size=GZIP_MINIMUM_SIZE, compresslevel=5)
+
+# Outermost, so timings and sizes cover compression and everything else. The live feed
+# has its own gauges and counters; its streams last as long as the client stays connected.
+app.add_middleware(metrics.MetricsMiddleware, untracked_paths=[FEED_PATH])
+
+
+# Opt-in streaming for large listings: one JSON object per line, sent as rows are fetched
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+STREAM_BATCH_SIZE = 500  # rows fetched from the server-side cursor per chunk
+
+
+def wants_ndjson(request: Request) -> bool:
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+def json_response(response: Response, content) -> ORJSONResponse:
+    """
+    Return already JSON-ready content (dicts from enrich_deal) straight through orjson,
+    skipping FastAPI's jsonable_encoder pass, with headers set by dependencies.
+    """
+    return ORJSONResponse(content, headers=dict(response.headers))
+
+
+def raw_json_response(response: Response, body: str) -> Response:
+    """Return JSON text that is already serialized (stored deal cards) as-is"""
+    return Response(body, media_type="application/json", headers=dict(response.headers))
+
+
+def rows_response(response: Response, adapter, rows) -> Response:
+    """
+    Serialize plain rows from a list query through a precompiled schemas adapter. The
+    route's response_model still documents the shape, but isn't re-validated per row.
+    """
+    body = adapter.dump_json([row._asdict() for row in rows])
+    return Response(body, media_type="application/json", headers=dict(response.headers))
+
+
+async def stream_deal_cards(statement, replica: bool):
+    async for rows in stream_partitions(statement, STREAM_BATCH_SIZE, replica=replica):
+        yield "".join(cards.serve_card(row.card, row.image_url) + "\n" for row in rows)
+
+
+# Read-through cache for /api/deals-enriched, cleared by any write that changes its output
+deals_cache = cache.build_cache()
+
+
+async def record_write(db, *tables: str, events: List[dict] = ()):
+    """
+    Invalidate cached reads after a committed write to the given tables, publish its
+    live feed events to every worker, and keep the client's next reads on the primary
+    until a replica has caught up with it
+    """
+    lsn = await run_db(db, crud.bump_table_versions, tables, feed.notifications(events))
+    database.remember_write(lsn)
+    if "deals" in tables or "businesses" in tables:
+        await deals_cache.clear()
+
+
+def vote_event(entity_type: str, entity_id: int, vote_score: int) -> dict:
+    return {"type": "vote", "entity_type": entity_type, "id": entity_id, "vote_score": vote_score}
+
+
+def conditional_get(*tables: str):
+    """
+    Dependency for GET routes whose output depends only on the given tables.
+    Sets a strong ETag from the URL and table versions, and answers a matching
+    If-None-Match with 304 before the route queries or serializes anything.
+    """
+    async def check_etag(request: Request, response: Response, db=Depends(get_session)):
+        versions = await run_db(db, crud.get_table_versions, tables)
+        if request.query_params.get("active_now", "").lower() in ("1", "true", "yes", "on"):
+            # "Active now" results change with the clock, not just with writes
+            versions["active_minute"] = schedule.resolve_active_minute(active_now=True)
+        if wants_ndjson(request):
+            versions["format"] = "ndjson"
+        # Also keys the enriched deals cache, so a lagging replica's pages aren't served as current
+        request.state.table_versions = versions
+        etag = etags.make_etag(request.url.path, request.url.query, versions)
+        headers = {"ETag": etag, "Cache-Control": etags.cache_control(), "Vary": "Accept"}
+        if etags.etag_matches(request.headers.get("if-none-match"), etag):
+            raise HTTPException(status_code=304, headers=headers)
+        response.headers.update(headers)
+    return Depends(check_etag)
+
+
+# ?sort= rankings for deal listings, highest first (see crud.DEAL_RANKINGS)
+DealSort = Optional[Literal["hot", "top", "new"]]
+
+
+def set_next_cursor(response: Response, items, limit: int, sort_key):
+    """Expose the cursor for the next page, if there is one"""
+    cursor = pagination.next_cursor(items, limit, sort_key)
+    if cursor:
+        response.headers[pagination.NEXT_CURSOR_HEADER] = cursor
+
 
 @app.get("/")
-def read_root():
+async def read_root():
     return {"message": "Welcome to Oakland Food Deals API"}
 
 
 # Business endpoints
 @app.post("/businesses/", response_model=schemas.Business, status_code=201)
-def create_business(business: schemas.BusinessCreate, db: Session = Depends(get_db)):
-    return crud.create_business(db=db, business=business)
+async def create_business(business: schemas.BusinessCreate, db=Depends(get_session)):
+    db_business = await run_db(db, crud.create_business, business=business)
+    await record_write(db, "businesses")
+    return db_business
 
 
-@app.get("/businesses/", response_model=List[schemas.Business])
-def read_businesses(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    businesses = crud.get_businesses(db, skip=skip, limit=limit)
-    return businesses
+@app.get("/businesses/", response_model=List[schemas.Business], dependencies=[conditional_get("businesses")])
+async def read_businesses(response: Response, skip: int = Query(0, deprecated=True), limit: int = 100,
+                          cursor: Optional[str] = None, db=Depends(get_session)):
+    try:
+        businesses = await run_db(db, crud.get_businesses, skip=skip, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    set_next_cursor(response, businesses, limit, crud.BUSINESS_SORT_KEY)
+    return rows_response(response, schemas.BUSINESS_ROWS, businesses)
 
 
-@app.get("/businesses/{business_id}", response_model=schemas.Business)
-def read_business(business_id: int, db: Session = Depends(get_db)):
-    db_business = crud.get_business(db, business_id=business_id)
+@app.get("/businesses/{business_id}", response_model=schemas.Business, dependencies=[conditional_get("businesses")])
+async def read_business(business_id: int, db=Depends(get_session)):
+    db_business = await run_db(db, crud.get_business, business_id=business_id)
     if db_business is None:
         raise HTTPException(status_code=404, detail="Business not found")
     return db_business
 
 
 @app.put("/businesses/{business_id}", response_model=schemas.Business)
-def update_business(business_id: int, business: schemas.BusinessUpdate, db: Session = Depends(get_db)):
-    db_business = crud.update_business(db, business_id=business_id, business=business)
+async def update_business(business_id: int, business: schemas.BusinessUpdate, db=Depends(get_session)):
+    db_business = await run_db(db, crud.update_business, business_id=business_id, business=business)
     if db_business is None:
         raise HTTPException(status_code=404, detail="Business not found")
+    await record_write(db, "businesses")
     return db_business
 
 
 @app.delete("/businesses/{business_id}", status_code=204)
-def delete_business(business_id: int, db: Session = Depends(get_db)):
-    success = crud.delete_business(db, business_id=business_id)
+async def delete_business(business_id: int, db=Depends(get_session)):
+    success = await run_db(db, crud.delete_business, business_id=business_id)
     if not success:
         raise HTTPException(status_code=404, detail="Business not found")
+    await record_write(db, "businesses", "deals", "comments")
 
 
 @app.post("/businesses/{business_id}/vote", response_model=schemas.Business)
-def vote_business(business_id: int, vote: schemas.VoteUpdate, db: Session = Depends(get_db)):
+async def vote_business(business_id: int, vote: schemas.VoteUpdate, db=Depends(get_session)):
     if vote.vote not in [1, -1]:
         raise HTTPException(status_code=400, detail="Vote must be 1 or -1")
-    db_business = crud.update_business_vote(db, business_id=business_id, vote=vote.vote)
+    db_business = await run_db(db, crud.update_business_vote, business_id=business_id, vote=vote.vote)
     if db_business is None:
         raise HTTPException(status_code=404, detail="Business not found")
+    await record_write(db, "businesses", events=[vote_event("business", business_id, db_business.vote_score)])
     return db_business
 
 
 # Deal endpoints
 @app.post("/deals/", response_model=schemas.Deal, status_code=201)
-def create_deal(deal: schemas.DealCreate, db: Session = Depends(get_db)):
-    return crud.create_deal(db=db, deal=deal)
+async def create_deal(deal: schemas.DealCreate, db=Depends(get_session)):
+    db_deal = await run_db(db, crud.create_deal, deal=deal)
+    await record_write(db, "deals", events=[
+        {"type": "deal_created", "deal_id": db_deal.id, "business_id": db_deal.business_id}])
+    return db_deal
 
 
-@app.get("/deals/", response_model=List[schemas.Deal])
-def read_deals(skip: int = 0, limit: int = 100, business_id: Optional[int] = None, db: Session = Depends(get_db)):
-    deals = crud.get_deals(db, skip=skip, limit=limit, business_id=business_id)
-    return deals
+@app.get("/deals/", response_model=List[schemas.Deal], dependencies=[conditional_get("deals")])
+async def read_deals(response: Response, skip: int = Query(0, deprecated=True), limit: int = 100,
+                     business_id: Optional[int] = None, active_at: Optional[datetime] = None, active_now: bool = False,
+                     cursor: Optional[str] = None, sort: DealSort = None, db=Depends(get_session)):
+    active_minute = schedule.resolve_active_minute(active_at, active_now)
+    try:
+        deals = await run_db(db, crud.get_deals, skip=skip, limit=limit, business_id=business_id,
+                             active_minute=active_minute, cursor=cursor, sort=sort)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    set_next_cursor(response, deals, limit, crud.deal_sort_key(sort))
+    return rows_response(response, schemas.DEAL_ROWS, deals)
 
 
-@app.get("/deals/{deal_id}", response_model=schemas.Deal)
-def read_deal(deal_id: int, db: Session = Depends(get_db)):
-    db_deal = crud.get_deal(db, deal_id=deal_id)
+@app.get("/deals/{deal_id}", response_model=schemas.Deal, dependencies=[conditional_get("deals")])
+async def read_deal(deal_id: int, db=Depends(get_session)):
+    db_deal = await run_db(db, crud.get_deal, deal_id=deal_id)
     if db_deal is None:
         raise HTTPException(status_code=404, detail="Deal not found")
     return db_deal
 
 
 @app.put("/deals/{deal_id}", response_model=schemas.Deal)
-def update_deal(deal_id: int, deal: schemas.DealUpdate, db: Session = Depends(get_db)):
-    db_deal = crud.update_deal(db, deal_id=deal_id, deal=deal)
+async def update_deal(deal_id: int, deal: schemas.DealUpdate, db=Depends(get_session)):
+    db_deal = await run_db(db, crud.update_deal, deal_id=deal_id, deal=deal)
     if db_deal is None:
         raise HTTPException(status_code=404, detail="Deal not found")
+    await record_write(db, "deals")
     return db_deal
 
 
 @app.delete("/deals/{deal_id}", status_code=204)
-def delete_deal(deal_id: int, db: Session = Depends(get_db)):
-    success = crud.delete_deal(db, deal_id=deal_id)
+async def delete_deal(deal_id: int, db=Depends(get_session)):
+    success = await run_db(db, crud.delete_deal, deal_id=deal_id)
     if not success:
         raise HTTPException(status_code=404, detail="Deal not found")
+    await record_write(db, "deals", "comments")
 
 
 @app.post("/deals/{deal_id}/vote", response_model=schemas.Deal)
-def vote_deal(deal_id: int, vote: schemas.VoteUpdate, db: Session = Depends(get_db)):
+async def vote_deal(deal_id: int, vote: schemas.VoteUpdate, db=Depends(get_session)):
     if vote.vote not in [1, -1]:
         raise HTTPException(status_code=400, detail="Vote must be 1 or -1")
-    db_deal = crud.update_deal_vote(db, deal_id=deal_id, vote=vote.vote)
+    db_deal = await run_db(db, crud.update_deal_vote, deal_id=deal_id, vote=vote.vote)
     if db_deal is None:
         raise HTTPException(status_code=404, detail="Deal not found")
+    await record_write(db, "deals", events=[vote_event("deal", deal_id, db_deal.vote_score)])
     return db_deal
 
 
 # Comment endpoints
 @app.post("/comments/", response_model=schemas.Comment, status_code=201)
-def create_comment(comment: schemas.CommentCreate, db: Session = Depends(get_db)):
+async def create_comment(comment: schemas.CommentCreate, db=Depends(get_session)):
     if (comment.business_id is None and comment.deal_id is None) or \
        (comment.business_id is not None and comment.deal_id is not None):
         raise HTTPException(status_code=400, detail="Comment must belong to either a business or a deal, not both")
-    return crud.create_comment(db=db, comment=comment)
+    db_comment = await run_db(db, crud.create_comment, comment=comment)
+    await record_write(db, "comments", events=[{"type": "comment_created", "comment_id": db_comment.id,
+                                                "deal_id": db_comment.deal_id, "business_id": db_comment.business_id}])
+    return db_comment
 
 
-@app.get("/comments/", response_model=List[schemas.Comment])
-def read_comments(skip: int = 0, limit: int = 100, business_id: Optional[int] = None,
-                 deal_id: Optional[int] = None, db: Session = Depends(get_db)):
-    comments = crud.get_comments(db, skip=skip, limit=limit, business_id=business_id, deal_id=deal_id)
-    return comments
+@app.get("/comments/", response_model=List[schemas.Comment], dependencies=[conditional_get("comments")])
+async def read_comments(response: Response, skip: int = Query(0, deprecated=True), limit: int = 100,
+                        business_id: Optional[int] = None, deal_id: Optional[int] = None, cursor: Optional[str] = None,
+                        db=Depends(get_session)):
+    try:
+        comments = await run_db(db, crud.get_comments, skip=skip, limit=limit, business_id=business_id,
+                                deal_id=deal_id, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    set_next_cursor(response, comments, limit, crud.COMMENT_SORT_KEY)
+    return rows_response(response, schemas.COMMENT_ROWS, comments)
 
 
-@app.get("/comments/{comment_id}", response_model=schemas.Comment)
-def read_comment(comment_id: int, db: Session = Depends(get_db)):
-    db_comment = crud.get_comment(db, comment_id=comment_id)
+@app.get("/comments/{comment_id}", response_model=schemas.Comment, dependencies=[conditional_get("comments")])
+async def read_comment(comment_id: int, db=Depends(get_session)):
+    db_comment = await run_db(db, crud.get_comment, comment_id=comment_id)
     if db_comment is None:
         raise HTTPException(status_code=404, detail="Comment not found")
     return db_comment
 
 
 @app.put("/comments/{comment_id}", response_model=schemas.Comment)
-def update_comment(comment_id: int, comment: schemas.CommentUpdate, db: Session = Depends(get_db)):
-    db_comment = crud.update_comment(db, comment_id=comment_id, comment=comment)
+async def update_comment(comment_id: int, comment: schemas.CommentUpdate, db=Depends(get_session)):
+    db_comment = await run_db(db, crud.update_comment, comment_id=comment_id, comment=comment)
     if db_comment is None:
         raise HTTPException(status_code=404, detail="Comment not found")
+    await record_write(db, "comments")
     return db_comment
 
 
 @app.delete("/comments/{comment_id}", status_code=204)
-def delete_comment(comment_id: int, db: Session = Depends(get_db)):
-    success = crud.delete_comment(db, comment_id=comment_id)
+async def delete_comment(comment_id: int, db=Depends(get_session)):
+    success = await run_db(db, crud.delete_comment, comment_id=comment_id)
     if not success:
         raise HTTPException(status_code=404, detail="Comment not found")
+    await record_write(db, "comments")
 
 
 @app.post("/comments/{comment_id}/vote", response_model=schemas.Comment)
-def vote_comment(comment_id: int, vote: schemas.VoteUpdate, db: Session = Depends(get_db)):
+async def vote_comment(comment_id: int, vote: schemas.VoteUpdate, db=Depends(get_session)):
     if vote.vote not in [1, -1]:
         raise HTTPException(status_code=400, detail="Vote must be 1 or -1")
-    db_comment = crud.update_comment_vote(db, comment_id=comment_id, vote=vote.vote)
+    db_comment = await run_db(db, crud.update_comment_vote, comment_id=comment_id, vote=vote.vote)
     if db_comment is None:
         raise HTTPException(status_code=404, detail="Comment not found")
+    await record_write(db, "comments", events=[vote_event("comment", comment_id, db_comment.vote_score)])
     return db_comment
 
 
+# Batch vote endpoint
+VOTE_TABLES = {"business": "businesses", "deal": "deals", "comment": "comments"}
+
+
+@app.post("/votes/batch", response_model=List[schemas.VoteScore])
+async def vote_batch(batch: schemas.VoteBatch, db=Depends(get_session)):
+    """
+    Apply several votes in one round trip and one transaction, e.g. a vote flip
+    (delta -2 or +2) or clicks coalesced by the client. Repeated entities are summed.
+    Returns each entity's new score; if any entity doesn't exist, nothing is applied.
+    """
+    try:
+        scores = await run_db(db, crud.apply_vote_batch, operations=batch.votes)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=e.args[0])
+    await record_write(db, *dict.fromkeys(VOTE_TABLES[vote.entity_type] for vote in batch.votes),
+                       events=[vote_event(*score) for score in scores])
+    return [schemas.VoteScore(entity_type=entity_type, id=entity_id, vote_score=vote_score)
+            for entity_type, entity_id, vote_score in scores]
+
+
+# Live feed
+@app.get(FEED_PATH)
+async def live_events():
+    """
+    Server-Sent Events stream of deal_created, comment_created and vote events from
+    every worker (see app/feed.py). Missed events aren't replayed: after a reconnect or
+    a "resync" event, clients should refetch what they show.
+    """
+    if feed.broker.full:
+        raise HTTPException(status_code=503, detail="Live feed is full", headers={"Retry-After": "30"})
+    return StreamingResponse(feed.broker.stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+# Image variants
+@app.get("/images/{filename}")
+async def get_image_variant(filename: str):
+    """
+    A resized deal image variant, as named in a card's image_srcset (see app/images.py).
+    The name includes a hash of the source, so responses are cacheable forever; a
+    variant that hasn't been rendered yet is rendered before responding, and one whose
+    source image has since changed redirects to the current image's variant.
+    """
+    path = images.cached_path(filename)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Image not found")
+    if not os.path.exists(path):
+        future = await run_in_threadpool(images.renderer.render_for, filename)
+        if future is None:
+            current = await run_in_threadpool(images.renderer.current_filename, filename)
+            if current is None:
+                raise HTTPException(status_code=404, detail="Image not found")
+            # Relative, so it resolves under whatever prefix the client used (/api/images/ behind nginx)
+            return RedirectResponse(current, headers={"Cache-Control": "no-cache"})
+        await asyncio.wrap_future(future)
+    return FileResponse(path, headers={"Cache-Control": images.CACHE_CONTROL})
+
+
+# Bulk import endpoint
+@app.post("/bulk/deals", response_model=schemas.BulkImportResult)
+async def bulk_import_deals(request: Request, db=Depends(get_session)):
+    """
+    Import deals from an NDJSON (default) or CSV (Content-Type: text/csv) body, streamed
+    in batches. Businesses are upserted by google_place_id. Rows that fail validation or
+    are rejected by the database are reported by row number; the rest are still imported.
+    """
+    fmt = bulk.detect_format(request.headers.get("content-type"))
+    splitter, parser = bulk.RecordSplitter(quoted=fmt == "csv"), bulk.RecordParser(fmt)
+    result = schemas.BulkImportResult()
+
+    batch = []
+    async for chunk in request.stream():
+        batch.extend(parsed for parsed in map(parser.parse, splitter.feed(chunk)) if parsed)
+        if len(batch) >= bulk.BATCH_SIZE:
+            await run_db(db, crud.bulk_import_deals, batch, result)
+            batch = []
+    batch.extend(parsed for parsed in map(parser.parse, splitter.finish()) if parsed)
+    if batch:
+        await run_db(db, crud.bulk_import_deals, batch, result)
+
+    if result.deals_created:
+        await record_write(db, "businesses", "deals")
+    return result
+
+
 # Enriched deals endpoint - joins deals with business info for frontend
-@app.get("/api/deals-enriched")
-def get_deals_enriched(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+@app.get("/api/deals-enriched", dependencies=[conditional_get("deals", "businesses")])
+async def get_deals_enriched(request: Request, response: Response, skip: int = Query(0, deprecated=True), limit: int = 100,
+                             ids: Optional[List[int]] = Query(None),
+                             active_at: Optional[datetime] = None, active_now: bool = False,
+                             bbox: Optional[str] = None, near: Optional[str] = None, radius_m: float = 1000,
+                             cursor: Optional[str] = None, sort: DealSort = None, db=Depends(get_session)):
     """
     Get deals with business information joined.
-    Returns data in format compatible with frontend expectations.
-    """
-    deals = db.query(models.Deal).offset(skip).limit(limit).all()
-
-    enriched_deals = []
-    for deal in deals:
-        business = db.query(models.Business).filter(models.Business.id == deal.business_id).first()
-        if not business:
-            continue
-
-        enriched_deal = {
-            "id": deal.id,
-            "business_id": business.id,
-            "restaurant_name": business.name,
-            "deal_description": deal.description or "",
-            "schedule": {
-                "days": [day.capitalize() for day in (deal.days_active or [])],
-                "start_time": str(deal.time_start) if deal.time_start else "",
-                "end_time": str(deal.time_end) if deal.time_end else ""
-            },
-            "vote_count": deal.vote_score,
-            "address": business.address,
-            "phone": business.phone,
-            "google_place_id": business.google_place_id,
-            "created_by": deal.created_by,
-            "created_at": deal.created_at.isoformat() if deal.created_at else None,
-            # Use deal's image_url if set, otherwise assign default based on deal ID
-            "image_url": deal.image_url or get_default_image(deal.id),
-            # Location for map - use actual coordinates from business, fallback to Oakland downtown
-            "location": {"lat": business.latitude or 37.8044, "lng": business.longitude or -122.2712},
-            "neighborhood": None,  # TODO: Add to database later
-            # Additional fields that might be useful
-            "deal_type": deal.deal_type,
-            "food_items": deal.food_items,
-            "drink_items": deal.drink_items,
-            "pricing": deal.pricing,
-            "tags": deal.tags,
-            "website": business.website,
-        }
-        enriched_deals.append(enriched_deal)
-
-    return enriched_deals
+    Returns data in format compatible with frontend expectations, served from the stored deal cards.
+    Pass ?ids=1&ids=2 to fetch a specific batch of deals, and active_at / active_now=true
+    to only return deals running at that moment (Oakland local time).
+    For the map, bbox=south,west,north,east limits results to a viewport and
+    near=lat,lng&radius_m= returns deals within a radius ordered by distance.
+    sort=hot (votes with age decay), top (votes) or new ranks deals, highest first.
+    Page with the X-Next-Cursor response header passed back as ?cursor=.
+    With Accept: application/x-ndjson, streams one deal per line instead, straight from
+    the database (uncached, no cursor header), so large limits don't buffer the response.
+    """
+    active_minute = schedule.resolve_active_minute(active_at, active_now)
+    try:
+        bounds = geo.parse_bbox(bbox) if bbox else None
+        center = geo.parse_near(near, radius_m) if near else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if wants_ndjson(request):
+        try:
+            statement = crud.deal_cards_statement(skip=skip, limit=limit, ids=ids, active_minute=active_minute,
+                                                  bbox=bounds, near=center, cursor=cursor, sort=sort)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        # X-Accel-Buffering: nginx passes each chunk on instead of buffering the stream
+        return StreamingResponse(stream_deal_cards(statement, database.is_replica(db)), media_type=NDJSON_MEDIA_TYPE,
+                                 headers={**response.headers, "X-Accel-Buffering": "no"})
+
+    cache_key = ("deals-enriched", skip, limit, tuple(ids) if ids else None, active_minute, bounds, center, cursor,
+                 sort, tuple(sorted(request.state.table_versions.items())))
+    cached = await deals_cache.get(cache_key)
+    if cached is None:
+        try:
+            rows = await run_db(db, crud.get_deal_cards, skip=skip, limit=limit, ids=ids,
+                                active_minute=active_minute, bbox=bounds, near=center, cursor=cursor, sort=sort)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        next_page = pagination.next_cursor(rows, limit, crud.deal_card_sort_key(sort)) if center is None else None
+        # Cards are stored as JSON text, so the page is assembled without decoding them
+        cached = ("[" + ",".join(cards.serve_card(row.card, row.image_url) for row in rows) + "]", next_page)
+        await deals_cache.set(cache_key, cached)
+
+    body, next_page = cached
+    if next_page:
+        response.headers[pagination.NEXT_CURSOR_HEADER] = next_page
+    return raw_json_response(response, body)
+
+
+@app.get("/search", dependencies=[conditional_get("deals", "businesses")])
+async def search_deals(response: Response, q: Optional[str] = None, tags: Optional[List[str]] = Query(None),
+                       limit: int = Query(20, ge=1, le=100), cursor: Optional[str] = None,
+                       db=Depends(get_session)):
+    """
+    Search deals by text and/or tags, best match first, in the enriched deal shape.
+    q matches the business name, tags, description and food/drink items, and accepts
+    web-search syntax ("quoted phrases", or, -excluded). ?tags=a&tags=b only returns
+    deals carrying all of those tags. Page with the X-Next-Cursor response header.
+    """
+    try:
+        rows, next_page = await run_db(db, crud.search_deals, q=q, tags=tags, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_page:
+        response.headers[pagination.NEXT_CURSOR_HEADER] = next_page
+    return json_response(response, [cards.with_image_srcset(cards.enrich_deal(row)) for row in rows])
+
+
+@app.get("/api/cache-stats")
+async def get_cache_stats():
+    """Hit/miss/eviction counters for the enriched deals cache, for sizing it"""
+    return deals_cache.stats()
+
+
+@app.get("/api/pool-stats")
+async def get_pool_stats():
+    """Connection pool checkout wait times and in-use counts, for sizing the pool"""
+    return pool.pool_stats.snapshot()
+
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def get_metrics():
+    """Prometheus scrape endpoint: request/DB metrics plus connection pool and cache counters"""
+    pool_snapshot = pool.pool_stats.snapshot()
+    cache_stats = deals_cache.stats()
+    extra = (
+        metrics.metric_lines("db_pool_checkouts_total", "Connection checkouts", "counter", pool_snapshot["checkouts"])
+        + metrics.metric_lines("db_pool_in_use", "Connections currently checked out", "gauge", pool_snapshot["in_use"])
+        + metrics.metric_lines("db_pool_wait_seconds_total", "Time spent waiting for a connection", "counter",
+                               pool_snapshot["wait_seconds_total"])
+        + metrics.metric_lines("db_pool_failed_checkouts_total", "Checkouts that timed out or failed", "counter",
+                               pool_snapshot["failed_checkouts"])
+        + metrics.metric_lines("deals_cache_hits_total", "Enriched deals cache hits", "counter", cache_stats["hits"])
+        + metrics.metric_lines("deals_cache_misses_total", "Enriched deals cache misses", "counter",
+                               cache_stats["misses"])
+        + metrics.metric_lines("feed_subscribers", "Open live feed connections", "gauge",
+                               feed.broker.subscriber_count)
+        + metrics.metric_lines("feed_events_total", "Live feed events received from Postgres", "counter",
+                               feed.broker.events_received)
+        + metrics.metric_lines("feed_resyncs_total", "Resync events sent after the listener reconnected", "counter",
+                               feed.broker.resyncs_sent)
+    )
+    return PlainTextResponse(metrics.render(extra), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/api/deals-enriched/{deal_id}", dependencies=[conditional_get("deals", "businesses")])
+async def get_deal_enriched(response: Response, deal_id: int, db=Depends(get_session)):
+    """Get a single deal with business information joined."""
+    row = await run_db(db, crud.get_deal_card, deal_id=deal_id)
+    if row is None:
+        raise HTTPException(status_code=404, detail="Deal not found")
+    return raw_json_response(response, cards.serve_card(row.card, row.image_url))
@@ -0,0 +1,205 @@
+"""
+Request-level performance metrics in Prometheus text format.
+
+MetricsMiddleware times every request and records its response size. SQLAlchemy cursor
+events (see instrument_engine) count and time the queries each request runs. A
+contextvar carries the per-request counters, so queries run in the threadpool or via
+AsyncSession.run_sync are attributed to the request that issued them. Requests slower
+than SLOW_REQUEST_MS are logged with the SQL they ran.
+
+Metrics are per process; with several workers each worker reports its own.
+"""
+import logging
+import os
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from dotenv import load_dotenv
+from sqlalchemy import event
+
+load_dotenv()
+
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "500"))  # 0 disables the slow-request log
+MAX_LOGGED_STATEMENTS = 25  # per slow request
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+logger = logging.getLogger("app.metrics")
+
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by a tuple of label values"""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str], buckets: Sequence[float]):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._series: Dict[Tuple[str, ...], list] = {}  # labels -> [bucket counts..., sum, count]
+
+    def observe(self, labels: Tuple[str, ...], value: float):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def lines(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labels, series in sorted(self._series.items()):
+                label_text = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(self.labels, labels))
+                prefix = label_text + "," if label_text else ""
+                for bound, count in zip(self.buckets, series):
+                    lines.append(f'{self.name}_bucket{{{prefix}le="{_format(bound)}"}} {count}')
+                lines.append(f'{self.name}_bucket{{{prefix}le="+Inf"}} {series[-1]}')
+                lines.append(f"{self.name}_sum{{{label_text}}} {_format(series[-2])}")
+                lines.append(f"{self.name}_count{{{label_text}}} {series[-1]}")
+        return lines
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def metric_lines(name: str, help: str, kind: str, value: float) -> List[str]:
+    """Lines for a single unlabelled counter or gauge"""
+    return [f"# HELP {name} {help}", f"# TYPE {name} {kind}", f"{name} {_format(value)}"]
+
+
+request_duration = Histogram("http_request_duration_seconds", "Request latency, including streaming the body",
+                             ("method", "route", "status"), LATENCY_BUCKETS)
+response_size = Histogram("http_response_size_bytes", "Response body size on the wire",
+                          ("method", "route"), SIZE_BUCKETS)
+request_queries = Histogram("http_request_db_queries", "Database queries run per request",
+                            ("method", "route"), QUERY_COUNT_BUCKETS)
+request_db_time = Histogram("http_request_db_seconds", "Time spent in database queries per request",
+                            ("method", "route"), LATENCY_BUCKETS)
+
+
+class QueryStats:
+    """Database queries run on behalf of one request"""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.statements: List[Tuple[float, str]] = []  # (seconds, SQL), capped
+
+    def record(self, seconds: float, statement: str):
+        self.count += 1
+        self.seconds += seconds
+        if len(self.statements) < MAX_LOGGED_STATEMENTS:
+            self.statements.append((seconds, statement))
+
+
+_current_queries: ContextVar[Optional[QueryStats]] = ContextVar("current_queries", default=None)
+
+# Totals across all queries in this process, in or out of a request
+_totals_lock = threading.Lock()
+queries_total = 0
+query_seconds_total = 0.0
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    global queries_total, query_seconds_total
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    with _totals_lock:
+        queries_total += 1
+        query_seconds_total += elapsed
+    stats = _current_queries.get()
+    if stats is not None:
+        stats.record(elapsed, statement)
+
+
+def instrument_engine(engine):
+    """Count and time queries on an engine (sync or the sync_engine of an async one)"""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _route_label(scope) -> str:
+    # The matched route's template keeps label cardinality bounded (/deals/{deal_id}, not /deals/7)
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording latency, response size and database work per request.
+    Requests to untracked_paths (long-lived streams, whose duration is how long the
+    client stayed connected) are passed straight through.
+    """
+
+    def __init__(self, app, untracked_paths: Iterable[str] = ()):
+        self.app = app
+        self.untracked_paths = frozenset(untracked_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.untracked_paths:
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _current_queries.set(stats)
+        started = time.perf_counter()
+        status = 500
+        size = 0
+
+        async def send_and_measure(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_and_measure)
+        finally:
+            _current_queries.reset(token)
+            elapsed = time.perf_counter() - started
+            method, route = scope["method"], _route_label(scope)
+            request_duration.observe((method, route, str(status)), elapsed)
+            response_size.observe((method, route), size)
+            request_queries.observe((method, route), stats.count)
+            request_db_time.observe((method, route), stats.seconds)
+            if SLOW_REQUEST_MS and elapsed * 1000 >= SLOW_REQUEST_MS:
+                _log_slow_request(scope, status, elapsed, size, stats)
+
+
+def _log_slow_request(scope, status: int, elapsed: float, size: int, stats: QueryStats):
+    path = scope["path"] + ("?" + scope["query_string"].decode("latin-1") if scope.get("query_string") else "")
+    statements = "".join(f"\n  {seconds * 1000:8.1f}ms  {' '.join(sql.split())}" for seconds, sql in stats.statements)
+    logger.warning(
+        "Slow request: %s %s -> %s in %.0fms, %d bytes, %d queries (%.0fms in the database)%s",
+        scope["method"], path, status, elapsed * 1000, size, stats.count, stats.seconds * 1000, statements,
+    )
+
+
+def render(extra: Iterable[str] = ()) -> str:
+    """All metrics in Prometheus text exposition format, plus any extra lines"""
+    with _totals_lock:
+        totals = (metric_lines("db_queries_total", "Database queries run by this process", "counter", queries_total)
+                  + metric_lines("db_query_seconds_total", "Time spent in database queries", "counter",
+                                 query_seconds_total))
+    lines = []
+    for histogram in (request_duration, response_size, request_queries, request_db_time):
+        lines += histogram.lines()
+    return "\n".join(lines + totals + list(extra)) + "\n"
@@ -1,6 +1,9 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, ARRAY, Time, CheckConstraint, Float
-from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy import (
+    Column, Integer, String, Text, ForeignKey, DateTime, ARRAY, Time, CheckConstraint, Computed, Float, Index,
+)
+from sqlalchemy.dialects.postgresql import INT4RANGE, JSONB, TSVECTOR
+from sqlalchemy.orm import deferred, relationship
+from sqlalchemy.sql import func, text
 from app.database import Base
 
 
@@ -23,12 +26,19 @@ class Business(Base):
     deals = relationship("Deal", back_populates="business", cascade="all, delete-orphan")
     comments = relationship("Comment", back_populates="business", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Viewport (bbox) queries
+        Index("ix_businesses_lat_lng", "latitude", "longitude"),
+        # Radius queries via the earthdistance extension
+        Index("ix_businesses_earth_point", text("ll_to_earth(latitude, longitude)"), postgresql_using="gist"),
+    )
+
 
 class Deal(Base):
     __tablename__ = "deals"
 
     id = Column(Integer, primary_key=True, index=True)
-    business_id = Column(Integer, ForeignKey("businesses.id"), nullable=False)
+    business_id = Column(Integer, ForeignKey("businesses.id"), nullable=False, index=True)
     deal_type = Column(String(100), nullable=False)  # 'happy_hour', 'breakfast_special', 'lunch_special', etc.
     days_active = Column(ARRAY(String))  # ['monday', 'tuesday', 'wednesday'] etc.
     time_start = Column(Time)
@@ -41,19 +51,70 @@ class Deal(Base):
     image_url = Column(String(500))  # Background image for the deal
     created_by = Column(String(100))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    vote_score = Column(Integer, default=0)
+    vote_score = Column(Integer, default=0, server_default="0", nullable=False)
+    # log10(votes) plus age; kept up to date by Postgres on every vote (see migrations)
+    hot_score = Column(Float, Computed("deal_hot_score(vote_score, created_at)", persisted=True), nullable=False)
+    # Weighted business name, tags, description and items; maintained by a trigger (see migrations)
+    search_vector = deferred(Column(TSVECTOR))
 
     # Relationships
     business = relationship("Business", back_populates="deals")
     comments = relationship("Comment", back_populates="deal", cascade="all, delete-orphan")
+    schedule_windows = relationship("DealScheduleWindow", back_populates="deal", cascade="all, delete-orphan")
+
+    __table_args__ = (
+        # Sort keys for listings, with id as the keyset tiebreaker
+        Index("ix_deals_vote_score_id", "vote_score", "id"),
+        Index("ix_deals_created_at_id", "created_at", "id"),
+        Index("ix_deals_hot_score_id", "hot_score", "id"),
+        # Full-text search and tag containment
+        Index("ix_deals_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_deals_tags", "tags", postgresql_using="gin"),
+    )
+
+
+class DealScheduleWindow(Base):
+    """Precomputed minute-of-week interval during which a deal is active (0 = Monday 00:00)"""
+    __tablename__ = "deal_schedule_windows"
+
+    id = Column(Integer, primary_key=True)
+    deal_id = Column(Integer, ForeignKey("deals.id", ondelete="CASCADE"), nullable=False, index=True)
+    minutes = Column(INT4RANGE, nullable=False)
+
+    # Relationships
+    deal = relationship("Deal", back_populates="schedule_windows")
+
+    __table_args__ = (
+        Index("ix_deal_schedule_windows_minutes", "minutes", postgresql_using="gist"),
+    )
+
+
+class DealCard(Base):
+    """
+    Ready-to-serve frontend card for a deal (app.cards.enrich_deal), re-rendered by crud
+    whenever the deal or its business changes. Location (the card's, including the
+    downtown fallback for businesses without coordinates) is copied out for map filters.
+    """
+    __tablename__ = "deal_cards"
+
+    deal_id = Column(Integer, ForeignKey("deals.id", ondelete="CASCADE"), primary_key=True)
+    business_id = Column(Integer, nullable=False, index=True)
+    latitude = Column(Float)
+    longitude = Column(Float)
+    card = Column(JSONB, nullable=False)
+
+    __table_args__ = (
+        Index("ix_deal_cards_lat_lng", "latitude", "longitude"),
+        Index("ix_deal_cards_earth_point", text("ll_to_earth(latitude, longitude)"), postgresql_using="gist"),
+    )
 
 
 class Comment(Base):
     __tablename__ = "comments"
 
     id = Column(Integer, primary_key=True, index=True)
-    business_id = Column(Integer, ForeignKey("businesses.id"), nullable=True)
-    deal_id = Column(Integer, ForeignKey("deals.id"), nullable=True)
+    business_id = Column(Integer, ForeignKey("businesses.id"), nullable=True, index=True)
+    deal_id = Column(Integer, ForeignKey("deals.id"), nullable=True, index=True)
     text = Column(Text, nullable=False)
     created_by = Column(String(100))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -65,6 +126,9 @@ class Comment(Base):
 
     # Constraint: comment must belong to either a business OR a deal, not both or neither
     __table_args__ = (
+        # Sort keys for listings, with id as the keyset tiebreaker
+        Index("ix_comments_vote_score_id", "vote_score", "id"),
+        Index("ix_comments_created_at_id", "created_at", "id"),
         CheckConstraint(
             '(business_id IS NOT NULL AND deal_id IS NULL) OR (business_id IS NULL AND deal_id IS NOT NULL)',
             name='comment_belongs_to_business_or_deal'
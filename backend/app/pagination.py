@@ -0,0 +1,66 @@
+import base64
+import json
+from datetime import datetime
+from typing import List, Optional, Sequence
+
+from sqlalchemy import tuple_
+
+# Response header carrying the cursor for the next page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+# JSON types accepted for a sort column's Python type (floats may round-trip as ints)
+_CURSOR_TYPES = {float: (int, float)}
+
+
+def encode_cursor(values: Sequence) -> str:
+    """Encode the sort-key values of the last row on a page as an opaque cursor"""
+    raw = json.dumps([v.isoformat() if isinstance(v, datetime) else v for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: Sequence) -> List:
+    """Decode a cursor back into sort-key values, raising ValueError if it is malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != len(columns):
+        raise ValueError("Invalid cursor")
+    try:
+        return [_cursor_value(column, value) for column, value in zip(columns, values)]
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+
+
+def _cursor_value(column, value):
+    """A cursor value as its sort column's type; TypeError if it can't be one"""
+    python_type = column.type.python_type
+    if python_type is datetime:
+        if not isinstance(value, str):
+            raise TypeError(f"{column.key} expects a timestamp")
+        return datetime.fromisoformat(value)
+    # bool is an int subclass, but no sort column is boolean
+    if isinstance(value, bool) or not isinstance(value, _CURSOR_TYPES.get(python_type, python_type)):
+        raise TypeError(f"{column.key} expects {python_type.__name__}")
+    return value
+
+
+def keyset_paginate(query, columns: Sequence, cursor: Optional[str], descending: bool = False):
+    """
+    Order a query by the given sort key (which must end in a unique column) and, if a
+    cursor is given, start right after the row it points at. Every page is an index seek
+    rather than an OFFSET scan, and rows inserted mid-scroll don't shift later pages.
+    """
+    if cursor:
+        values = decode_cursor(cursor, columns)
+        key = tuple_(*columns)
+        query = query.filter(key < tuple(values) if descending else key > tuple(values))
+    return query.order_by(*(column.desc() if descending else column for column in columns))
+
+
+def next_cursor(items: Sequence, limit: int, columns: Sequence) -> Optional[str]:
+    """Cursor for the page after items, or None when this was the last page"""
+    if not items or len(items) < limit:
+        return None
+    last = items[-1]
+    return encode_cursor([getattr(last, column.key) for column in columns])
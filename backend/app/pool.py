@@ -0,0 +1,136 @@
+import os
+import threading
+import time
+from typing import Tuple
+
+from dotenv import load_dotenv
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+
+load_dotenv()
+
+# Connection pool settings; the defaults suit a small RDS instance behind one worker
+DB_POOL_MODE = os.getenv("DB_POOL_MODE", "queue")  # "queue", or "pgbouncer" for transaction-mode PgBouncer
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "5"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))  # seconds to wait for a free connection
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # seconds; beat RDS/NAT idle timeouts
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "15000"))  # 0 disables
+
+# Connections all server workers together may hold (0: no cap). gunicorn.conf.py exports
+# WEB_CONCURRENCY to its workers; keep this below the RDS max_connections with headroom
+# for migrations, CLIs and workers being recycled.
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY") or "1")
+DB_MAX_CONNECTIONS = int(os.getenv("DB_MAX_CONNECTIONS") or "0")
+
+
+class PoolStats:
+    """Checkout wait times and in-use counts across all pools in this process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.in_use = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.failed_checkouts = 0  # timed out waiting, or couldn't connect
+
+    def record_wait(self, seconds: float, failed: bool = False):
+        with self._lock:
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            if failed:
+                self.failed_checkouts += 1
+
+    def checked_out(self):
+        with self._lock:
+            self.checkouts += 1
+            self.in_use += 1
+
+    def checked_in(self):
+        with self._lock:
+            self.in_use -= 1
+
+    def snapshot(self) -> dict:
+        pool_size, max_overflow = worker_pool_size() if DB_POOL_MODE != "pgbouncer" else (None, None)
+        with self._lock:
+            return {
+                "mode": DB_POOL_MODE,
+                "workers": WEB_CONCURRENCY,
+                "pool_size": pool_size,
+                "max_overflow": max_overflow,
+                "checkouts": self.checkouts,
+                "in_use": self.in_use,
+                "wait_seconds_total": round(self.wait_total, 6),
+                "wait_seconds_max": round(self.wait_max, 6),
+                "failed_checkouts": self.failed_checkouts,
+            }
+
+
+pool_stats = PoolStats()
+
+
+class _TimedCheckout:
+    """Mixin timing how long each checkout waits for a free connection"""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except Exception:
+            pool_stats.record_wait(time.perf_counter() - started, failed=True)
+            raise
+        pool_stats.record_wait(time.perf_counter() - started)
+        return connection
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    pass
+
+
+def worker_pool_size() -> Tuple[int, int]:
+    """(pool_size, max_overflow) for this worker, shrunk so every worker fits in DB_MAX_CONNECTIONS"""
+    if not DB_MAX_CONNECTIONS:
+        return DB_POOL_SIZE, DB_MAX_OVERFLOW
+    per_worker = max(1, DB_MAX_CONNECTIONS // max(1, WEB_CONCURRENCY))
+    pool_size = min(DB_POOL_SIZE, per_worker)
+    return pool_size, max(0, min(DB_MAX_OVERFLOW, per_worker - pool_size))
+
+
+def engine_options(is_async: bool = False) -> dict:
+    """Keyword arguments for create_engine / create_async_engine from the settings above"""
+    if DB_POOL_MODE == "pgbouncer":
+        # PgBouncer owns pooling; hold a server connection only for the length of a transaction.
+        # Session-level settings don't survive transaction pooling, so set statement_timeout on
+        # the database role instead, and turn off asyncpg's per-connection prepared statements.
+        options = {"poolclass": NullPool}
+        if is_async:
+            options["connect_args"] = {"statement_cache_size": 0, "prepared_statement_cache_size": 0}
+        return options
+
+    pool_size, max_overflow = worker_pool_size()
+    options = {
+        "poolclass": TimedAsyncQueuePool if is_async else TimedQueuePool,
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+    if DB_STATEMENT_TIMEOUT_MS:
+        if is_async:
+            options["connect_args"] = {"server_settings": {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"}
+    return options
+
+
+def instrument(engine):
+    """Track in-use connections for an engine (sync or the sync_engine of an async one)"""
+    event.listen(engine, "checkout", lambda *args: pool_stats.checked_out())
+    event.listen(engine, "checkin", lambda *args: pool_stats.checked_in())
@@ -0,0 +1,64 @@
+from datetime import datetime, time
+from typing import List, Optional
+from zoneinfo import ZoneInfo
+
+from sqlalchemy.dialects.postgresql import Range
+
+# Deals are scheduled in Oakland local time
+LOCAL_TZ = ZoneInfo("America/Los_Angeles")
+
+DAYS_OF_WEEK = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+
+def _minute_of_day(value: time) -> int:
+    return value.hour * 60 + value.minute
+
+
+def compute_schedule_windows(days_active: Optional[List[str]], time_start: Optional[time],
+                             time_end: Optional[time]) -> List[Range]:
+    """
+    Precompute a deal's weekly schedule as minute-of-week ranges (0 = Monday 00:00).
+    Windows that cross midnight spill into the next day, and Sunday night wraps to Monday.
+    Deals with no schedule at all get no windows.
+    """
+    if not days_active and time_start is None and time_end is None:
+        return []
+
+    # Deals with times but no days run every day; deals with days but no times run all day
+    days = [day.lower() for day in days_active] if days_active else DAYS_OF_WEEK
+    start = _minute_of_day(time_start) if time_start is not None else 0
+    end = _minute_of_day(time_end) if time_end is not None else MINUTES_PER_DAY
+    if end <= start:
+        end += MINUTES_PER_DAY
+
+    intervals = []
+    for day in days:
+        if day not in DAYS_OF_WEEK:
+            continue
+        day_offset = DAYS_OF_WEEK.index(day) * MINUTES_PER_DAY
+        lower, upper = day_offset + start, day_offset + end
+        if upper > MINUTES_PER_WEEK:
+            intervals.append((lower, MINUTES_PER_WEEK))
+            intervals.append((0, upper - MINUTES_PER_WEEK))
+        else:
+            intervals.append((lower, upper))
+
+    return [Range(lower, upper, bounds="[)") for lower, upper in sorted(intervals)]
+
+
+def minute_of_week(moment: datetime) -> int:
+    """Minute-of-week for a moment; naive datetimes are taken as Oakland local time."""
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(LOCAL_TZ)
+    return moment.weekday() * MINUTES_PER_DAY + moment.hour * 60 + moment.minute
+
+
+def resolve_active_minute(active_at: Optional[datetime] = None, active_now: bool = False) -> Optional[int]:
+    """Turn the active_at / active_now query parameters into a minute-of-week, if requested"""
+    if active_at is not None:
+        return minute_of_week(active_at)
+    if active_now:
+        return minute_of_week(datetime.now(LOCAL_TZ))
+    return None
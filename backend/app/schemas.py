@@ -1,6 +1,8 @@
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, field_validator
 from datetime import datetime, time
-from typing import Optional
+from typing import List, Literal, Optional, Type
+
+from typing_extensions import TypedDict
 
 
 # Business Schemas
@@ -105,6 +107,70 @@ class Comment(CommentBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+# List serializers for plain rows (crud's get_businesses/get_deals/get_comments).
+# Each is built once from the response schema's fields and writes JSON straight from
+# row dicts, so a list page isn't validated into models first. Rows are trusted
+# database output; keys outside the schema (e.g. sort columns) are left out.
+def rows_adapter(schema: Type[BaseModel]) -> TypeAdapter:
+    fields = {name: field.annotation for name, field in schema.model_fields.items()}
+    return TypeAdapter(List[TypedDict(f"{schema.__name__}Row", fields)])
+
+
+BUSINESS_ROWS = rows_adapter(Business)
+DEAL_ROWS = rows_adapter(Deal)
+COMMENT_ROWS = rows_adapter(Comment)
+
+
 # Vote Schemas
 class VoteUpdate(BaseModel):
     vote: int  # +1 for upvote, -1 for downvote
+
+
+class VoteOperation(BaseModel):
+    entity_type: Literal["business", "deal", "comment"]
+    id: int
+    delta: int = Field(..., ge=-2, le=2)  # net change: a flip from down to up is +2
+
+
+class VoteBatch(BaseModel):
+    votes: List[VoteOperation] = Field(..., min_length=1, max_length=100)
+
+
+class VoteScore(BaseModel):
+    entity_type: str
+    id: int
+    vote_score: int
+
+
+# Bulk import Schemas
+class BulkDealRow(DealBase):
+    """One imported row: a deal plus its business, matched on google_place_id"""
+    business_name: str
+    google_place_id: str
+    address: Optional[str] = None
+    phone: Optional[str] = None
+    website: Optional[str] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    created_by: str = "anonymous"
+
+    @field_validator("days_active", "tags", mode="before")
+    @classmethod
+    def split_list(cls, value):
+        # CSV cells hold lists as "monday;tuesday"
+        if isinstance(value, str):
+            return [item.strip() for item in value.split(";") if item.strip()] or None
+        return value
+
+
+class BulkRowError(BaseModel):
+    row: int
+    error: str
+
+
+class BulkImportResult(BaseModel):
+    rows: int = 0
+    businesses_upserted: int = 0
+    deals_created: int = 0
+    error_count: int = 0
+    errors: list[BulkRowError] = []  # capped at crud.MAX_REPORTED_ERRORS
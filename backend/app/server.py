@@ -0,0 +1,21 @@
+"""
+Uvicorn worker class for gunicorn (see gunicorn.conf.py).
+
+gunicorn supervises the workers: it restarts crashed ones, recycles them after
+max_requests and drains them gracefully on SIGTERM. Each worker runs its own event
+loop, connection pool, caches and metrics.
+"""
+import os
+
+from dotenv import load_dotenv
+from uvicorn_worker import UvicornWorker as BaseUvicornWorker
+
+load_dotenv()
+
+# "auto" picks uvloop / httptools when installed (uvicorn[standard]), else asyncio / h11
+UVICORN_LOOP = os.getenv("UVICORN_LOOP", "auto")  # "auto", "uvloop" or "asyncio"
+UVICORN_HTTP = os.getenv("UVICORN_HTTP", "auto")  # "auto", "httptools" or "h11"
+
+
+class UvicornWorker(BaseUvicornWorker):
+    CONFIG_KWARGS = {"loop": UVICORN_LOOP, "http": UVICORN_HTTP}
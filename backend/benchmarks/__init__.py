@@ -0,0 +1 @@
+# API benchmarks - run from backend/, e.g. `python -m benchmarks.db_modes`
@@ -0,0 +1,117 @@
+"""
+Check that every crud.py query path is served by an index.
+
+Seeds a large synthetic dataset inside a transaction, runs each crud function on a
+session joined to that transaction, captures the SQL it emits, and EXPLAINs each
+statement. Fails if any plan sequential-scans one of the app's tables. Everything is
+rolled back at the end, so it is safe to point at a development database (it needs
+the schema at `alembic upgrade head`).
+
+    python -m benchmarks.check_indexes --businesses 5000 --deals-per-business 10
+"""
+import argparse
+import json
+import sys
+from datetime import datetime
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+from app import crud, pagination, schedule
+from app.database import engine
+from benchmarks.seed import seed
+
+APP_TABLES = {"businesses", "deals", "comments", "deal_schedule_windows", "deal_cards"}
+
+
+def seq_scans(plan: dict):
+    """Yield the relation names of every Seq Scan node in an EXPLAIN (FORMAT JSON) plan"""
+    if plan.get("Node Type") == "Seq Scan" and plan.get("Relation Name") in APP_TABLES:
+        yield plan["Relation Name"]
+    for child in plan.get("Plans", []):
+        yield from seq_scans(child)
+
+
+def query_paths(db: Session, business_id: int, deal_id: int):
+    """(name, callable) for each read path in crud.py, plus the cascade delete"""
+    first_page = crud.get_deals(db, limit=50)
+    cursor = pagination.next_cursor(first_page, 50, crud.DEAL_SORT_KEY)
+    happy_hour = schedule.minute_of_week(datetime(2026, 1, 14, 16, 30))
+    # Seeded names end in a unique number, so this is a selective search term
+    business_name = crud.get_business(db, business_id).name
+    return [
+        ("get_business", lambda: crud.get_business(db, business_id)),
+        ("get_businesses (cursor)", lambda: crud.get_businesses(db, limit=50, cursor=cursor)),
+        ("get_deal", lambda: crud.get_deal(db, deal_id)),
+        ("get_deals (cursor)", lambda: crud.get_deals(db, limit=50, cursor=cursor)),
+        ("get_deals (business_id)", lambda: crud.get_deals(db, business_id=business_id)),
+        ("get_deals (active_minute)", lambda: crud.get_deals(db, limit=50, active_minute=happy_hour)),
+        ("get_deals (sort=hot)", lambda: crud.get_deals(db, limit=50, sort="hot")),
+        ("get_deals (sort=top)", lambda: crud.get_deals(db, limit=50, sort="top")),
+        ("get_comment", lambda: crud.get_comment(db, 1)),
+        ("get_comments (deal_id)", lambda: crud.get_comments(db, deal_id=deal_id)),
+        ("get_comments (business_id)", lambda: crud.get_comments(db, business_id=business_id)),
+        ("get_deal_card", lambda: crud.get_deal_card(db, deal_id)),
+        ("get_deal_cards", lambda: crud.get_deal_cards(db, limit=100)),
+        ("get_deal_cards (ids)", lambda: crud.get_deal_cards(db, ids=[deal_id, deal_id + 1])),
+        ("get_deal_cards (active_minute)", lambda: crud.get_deal_cards(db, limit=50, active_minute=happy_hour)),
+        ("get_deal_cards (bbox)", lambda: crud.get_deal_cards(db, bbox=(37.80, -122.28, 37.81, -122.27))),
+        ("get_deal_cards (near)", lambda: crud.get_deal_cards(db, near=(37.8044, -122.2712, 500))),
+        ("get_deal_cards (sort=hot)", lambda: crud.get_deal_cards(db, limit=100, sort="hot")),
+        ("update_deal_vote", lambda: crud.update_deal_vote(db, deal_id, 1)),
+        ("search_deals (q)", lambda: crud.search_deals(db, q=business_name)),
+        ("search_deals (q, tags)", lambda: crud.search_deals(db, q=business_name, tags=["happy_hour"])),
+        ("delete_deal (cascade)", lambda: crud.delete_deal(db, deal_id)),
+        ("delete_business (cascade)", lambda: crud.delete_business(db, business_id)),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--businesses", type=int, default=5000)
+    parser.add_argument("--deals-per-business", type=int, default=10)
+    parser.add_argument("--comments-per-deal", type=int, default=5)
+    args = parser.parse_args()
+
+    failures = []
+    with engine.connect() as connection:
+        transaction = connection.begin()
+        try:
+            tag = seed(connection, args.businesses, args.deals_per_business, args.comments_per_deal)
+            business_id, deal_id = connection.execute(text(
+                "SELECT b.id, d.id FROM businesses b JOIN deals d ON d.business_id = b.id "
+                "WHERE b.google_place_id LIKE :pattern ORDER BY d.id DESC LIMIT 1"
+            ), {"pattern": f"seed-%-{tag}"}).one()
+
+            # crud's commits only release a savepoint; the outer transaction is rolled back below
+            db = Session(bind=connection, join_transaction_mode="create_savepoint")
+            captured = []
+            event.listen(connection, "before_cursor_execute",
+                         lambda conn, cursor, statement, parameters, context, many:
+                         captured.append((statement, parameters)))
+
+            for name, run in query_paths(db, business_id, deal_id):
+                captured.clear()
+                run()
+                statements = [(sql, params) for sql, params in captured
+                              if sql.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE"))]
+                for sql, params in statements:
+                    plan = connection.exec_driver_sql("EXPLAIN (FORMAT JSON) " + sql, params).scalar()
+                    if isinstance(plan, str):
+                        plan = json.loads(plan)
+                    scanned = sorted(set(seq_scans(plan[0]["Plan"])))
+                    status = "SEQ SCAN " + ", ".join(scanned) if scanned else "ok"
+                    print(f"{name:32} {status:32} {' '.join(sql.split())[:90]}")
+                    if scanned:
+                        failures.append(name)
+        finally:
+            transaction.rollback()
+
+    if failures:
+        print(f"\n{len(failures)} statement(s) sequential-scan: {', '.join(sorted(set(failures)))}")
+        sys.exit(1)
+    print("\nAll query paths use indexes")
+
+
+if __name__ == "__main__":
+    main()
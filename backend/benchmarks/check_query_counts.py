@@ -0,0 +1,82 @@
+"""
+Check that listing queries don't grow with page size (no N+1 queries).
+
+Seeds synthetic data inside a transaction and runs each list path on a session joined
+to it at limit=1 and at limit=100, counting the statements each emits with a
+before_cursor_execute listener. Fails if any path runs more statements for the larger
+page. Everything is rolled back at the end, so it is safe to point at a development
+database (it needs the schema at `alembic upgrade head`).
+
+    python -m benchmarks.check_query_counts
+"""
+import argparse
+import sys
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app import cards, crud
+from app.database import engine
+from benchmarks.seed import seed
+
+LIMITS = (1, 100)
+
+
+def list_paths(db: Session, search_term: str):
+    """(name, callable taking a limit) for each listing read path"""
+    return [
+        ("get_deal_cards", lambda limit: crud.get_deal_cards(db, limit=limit)),
+        ("get_deal_cards (bbox)", lambda limit: crud.get_deal_cards(db, limit=limit, bbox=(37.0, -123.0, 38.5, -121.5))),
+        ("get_deal_cards (sort=hot)", lambda limit: crud.get_deal_cards(db, limit=limit, sort="hot")),
+        # Search renders each row into a card in Python; that mustn't query per row
+        ("search_deals (enriched)",
+         lambda limit: [cards.with_image_srcset(cards.enrich_deal(row)) for row in crud.search_deals(db, q=search_term, limit=limit)[0]]),
+        ("get_deals", lambda limit: crud.get_deals(db, limit=limit)),
+        ("get_businesses", lambda limit: crud.get_businesses(db, limit=limit)),
+        ("get_comments", lambda limit: crud.get_comments(db, limit=limit)),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--businesses", type=int, default=200)
+    parser.add_argument("--deals-per-business", type=int, default=2)
+    parser.add_argument("--comments-per-deal", type=int, default=1)
+    args = parser.parse_args()
+
+    failures = []
+    with engine.connect() as connection:
+        transaction = connection.begin()
+        try:
+            seed(connection, args.businesses, args.deals_per_business, args.comments_per_deal)
+            db = Session(bind=connection, join_transaction_mode="create_savepoint")
+            statements = []
+            event.listen(connection, "before_cursor_execute",
+                         lambda conn, cursor, statement, parameters, context, many: statements.append(statement))
+
+            # Every seeded deal description mentions oysters
+            for name, run in list_paths(db, "oysters"):
+                counts = []
+                for limit in LIMITS:
+                    db.expunge_all()
+                    statements.clear()
+                    rows = run(limit)
+                    if limit == max(LIMITS) and len(rows) < limit:
+                        raise SystemExit(f"{name}: only {len(rows)} rows; seed more data")
+                    counts.append(len(statements))
+                status = "ok" if len(set(counts)) == 1 else "GROWS WITH LIMIT"
+                print(f"{name:28} " + "  ".join(f"limit={limit}: {count}" for limit, count in zip(LIMITS, counts))
+                      + f"  {status}")
+                if status != "ok":
+                    failures.append(name)
+        finally:
+            transaction.rollback()
+
+    if failures:
+        print(f"\n{len(failures)} path(s) run more queries for larger pages: {', '.join(failures)}")
+        sys.exit(1)
+    print("\nQuery counts don't depend on page size")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Check that concurrent votes are never lost.
+
+Creates a throwaway business and deal, then fires --votes upvotes and downvotes at the
+deal from --concurrency threads at once, each on its own connection, through both
+crud.update_deal_vote and crud.apply_vote_batch. Fails unless the deal's vote_score
+and its stored card's vote_count both equal the exact sum of the votes. The business
+and deal are deleted afterwards. Needs a migrated DATABASE_URL.
+
+    python -m benchmarks.check_vote_race --votes 1000 --concurrency 50
+"""
+import argparse
+import json
+import random
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from app import crud, models, schemas
+from app.database import DATABASE_URL
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--votes", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    # A pool as wide as the thread count, so every vote really runs concurrently
+    engine = create_engine(DATABASE_URL, pool_size=args.concurrency, max_overflow=0)
+    Session = sessionmaker(bind=engine, autoflush=False)
+    random.seed(args.seed)
+    votes = [random.choice((1, -1)) for _ in range(args.votes)]
+    expected = sum(votes)
+
+    with Session() as db:
+        business = crud.create_business(db, schemas.BusinessCreate(name="Vote race check", created_by="vote-race"))
+        deal = crud.create_deal(db, schemas.DealCreate(business_id=business.id, deal_type="happy_hour",
+                                                       created_by="vote-race"))
+        business_id, deal_id, start_score = business.id, deal.id, deal.vote_score
+
+    first_wave = min(args.concurrency, args.votes)
+    start = threading.Barrier(first_wave)
+
+    def vote(i: int):
+        if i < first_wave:
+            start.wait()  # release the first wave together
+        with Session() as db:
+            if i % 2:
+                crud.update_deal_vote(db, deal_id, votes[i])
+            else:
+                crud.apply_vote_batch(db, [schemas.VoteOperation(entity_type="deal", id=deal_id, delta=votes[i])])
+
+    try:
+        with ThreadPoolExecutor(args.concurrency) as executor:
+            list(executor.map(vote, range(args.votes)))
+        with Session() as db:
+            score = db.execute(select(models.Deal.vote_score).where(models.Deal.id == deal_id)).scalar_one()
+            card = db.execute(select(models.DealCard.card).where(models.DealCard.deal_id == deal_id)).scalar_one()
+    finally:
+        with Session() as db:
+            crud.delete_business(db, business_id)
+        engine.dispose()
+
+    card = json.loads(card) if isinstance(card, str) else card
+    result = {"votes": args.votes, "concurrency": args.concurrency, "expected": start_score + expected,
+              "vote_score": score, "card_vote_count": card["vote_count"]}
+    print(json.dumps(result, indent=2))
+    if score != result["expected"] or card["vote_count"] != result["expected"]:
+        print(f"\nLost votes: {result['expected'] - score} on the deal, "
+              f"{result['expected'] - card['vote_count']} on its card")
+        sys.exit(1)
+    print("\nNo votes lost")
+
+
+if __name__ == "__main__":
+    main()
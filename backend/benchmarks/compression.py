@@ -0,0 +1,73 @@
+"""
+Measure what response compression and the nginx edge cache save.
+
+Starts the API twice against DATABASE_URL, with GZipMiddleware off and on, and drives
+the same listing endpoints with a gzip-accepting client. Reports bytes on the wire per
+response alongside RPS and latency. On localhost compression mostly shows up as
+bandwidth; latency gains come from the slower links real clients use, and from the edge.
+
+Pass --edge-url to also drive the same paths through a running nginx (the shipped
+nginx.conf, e.g. a staging host). Its X-Cache-Status header shows how often the
+short-lived proxy_cache answered without reaching the backend. Needs a migrated
+database with some data and `pip install httpx`.
+
+    python -m benchmarks.compression --concurrency 50 --duration 10
+    python -m benchmarks.compression --edge-url https://staging.example.com
+"""
+import argparse
+import asyncio
+import json
+
+import httpx
+
+from benchmarks.load import run_load, start_server
+
+ENDPOINTS = ["/api/deals-enriched?limit=100", "/api/deals-enriched?limit=1000", "/deals/?limit=100"]
+# nginx serves the backend under /api/
+EDGE_PREFIX = "/api"
+
+
+def cache_statuses(edge_url: str, path: str, samples: int = 20) -> dict:
+    """Count X-Cache-Status values over a few sequential requests"""
+    counts = {}
+    with httpx.Client(base_url=edge_url, verify=False, timeout=30) as client:
+        for _ in range(samples):
+            status = client.get(path).headers.get("X-Cache-Status", "none")
+            counts[status] = counts.get(status, 0) + 1
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--port", type=int, default=8767)
+    parser.add_argument("--edge-url", help="nginx base URL to drive as well")
+    args = parser.parse_args()
+
+    gzip_headers = {"Accept-Encoding": "gzip"}
+    results = {}
+    for name, minimum_size in (("no gzip", "0"), ("gzip", "1000")):
+        server = start_server(args.port, GZIP_MINIMUM_SIZE=minimum_size)
+        try:
+            base_url = f"http://127.0.0.1:{args.port}"
+            for path in ENDPOINTS:
+                asyncio.run(run_load(base_url, path, min(args.concurrency, 10), 1, headers=gzip_headers))
+                results[f"backend {name} {path}"] = asyncio.run(
+                    run_load(base_url, path, args.concurrency, args.duration, headers=gzip_headers))
+        finally:
+            server.terminate()
+            server.wait()
+
+    if args.edge_url:
+        for path in ENDPOINTS:
+            edge_path = EDGE_PREFIX + path
+            results[f"edge {path}"] = asyncio.run(
+                run_load(args.edge_url, edge_path, args.concurrency, args.duration, headers=gzip_headers, verify=False))
+            results[f"edge {path}"]["cache_status"] = cache_statuses(args.edge_url, edge_path)
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
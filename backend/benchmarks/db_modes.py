@@ -0,0 +1,45 @@
+"""
+Compare the sync (psycopg2 + threadpool) and async (asyncpg + AsyncSession) database
+paths at high concurrency.
+
+Starts the API twice against DATABASE_URL, once per DB_ASYNC setting, and drives the
+same endpoints at the same concurrency. Needs a migrated database with some data and
+`pip install httpx`.
+
+    python -m benchmarks.db_modes --concurrency 200 --duration 15
+"""
+import argparse
+import asyncio
+import json
+
+from benchmarks.load import run_load, start_server
+
+ENDPOINTS = ["/api/deals-enriched?limit=100", "/deals/?limit=100"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=15)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    results = {}
+    for db_async in (False, True):
+        mode = "async" if db_async else "sync"
+        server = start_server(args.port, DB_ASYNC="true" if db_async else "false", DEALS_CACHE_TTL="0")
+        try:
+            base_url = f"http://127.0.0.1:{args.port}"
+            for path in ENDPOINTS:
+                # Short warm-up so both modes start with open connections
+                asyncio.run(run_load(base_url, path, min(args.concurrency, 10), 1))
+                results[f"{mode} {path}"] = asyncio.run(run_load(base_url, path, args.concurrency, args.duration))
+        finally:
+            server.terminate()
+            server.wait()
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Minimal async HTTP load driver shared by the benchmarks."""
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float, downloaded: int = 0) -> Dict[str, float]:
+    """RPS, latency percentiles (milliseconds) and bytes on the wire per response for one run"""
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 2) if latencies else 0.0,
+        "bytes_per_response": round(downloaded / len(latencies)) if latencies else 0,
+    }
+
+
+async def run_load(base_url: str, path: str, concurrency: int, duration: float,
+                   method: str = "GET", json=None, headers: Optional[dict] = None,
+                   verify: bool = True) -> Dict[str, float]:
+    """
+    Keep `concurrency` requests in flight against one endpoint for `duration` seconds.
+    path and json may be callables, to vary the target per request (e.g. random ids).
+    """
+    latencies: List[float] = []
+    errors = 0
+    downloaded = 0
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30, headers=headers,
+                                 verify=verify) as client:
+        async def worker():
+            nonlocal errors, downloaded
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    response = await client.request(method, path() if callable(path) else path,
+                                                    json=json() if callable(json) else json)
+                    if response.status_code >= 400:
+                        errors += 1
+                        continue
+                except httpx.HTTPError:
+                    errors += 1
+                    continue
+                latencies.append(time.perf_counter() - started)
+                downloaded += response.num_bytes_downloaded
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return summarize(latencies, errors, elapsed, downloaded)
+
+
+def start_server(port: int, **env: str) -> subprocess.Popen:
+    """Start the API with extra environment settings and wait until it answers"""
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=dict(os.environ, **env),
+    )
+    for _ in range(100):
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/", timeout=1)
+            return process
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError("API server did not start")
@@ -0,0 +1,3 @@
+#!/bin/sh
+# Let the replica container stream WAL from this one
+echo "host replication all all scram-sha-256" >> "$PGDATA/pg_hba.conf"
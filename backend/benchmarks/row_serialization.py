@@ -0,0 +1,117 @@
+"""
+Per-row cost of the /businesses/, /deals/ and /comments/ list pages: loading ORM objects
+and validating them through the route's response_model (the old path) against
+selecting plain rows and writing them with the precompiled schemas adapters.
+
+Seeds data inside a transaction, times each path's fetch (query plus row or object
+loading) and serialization separately in-process, and rolls everything back, so it's
+safe to point at a development database at `alembic upgrade head`.
+
+    python -m benchmarks.row_serialization --limit 100 --repeat 200
+"""
+import argparse
+import asyncio
+import json
+import time
+from typing import List
+
+from fastapi.responses import ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from sqlalchemy.orm import Session
+
+from app import crud, models, schemas
+from app.database import engine
+from benchmarks.seed import seed
+
+# (route, ORM model, response schema, sort key, current crud function, precompiled adapter)
+ROUTES = [
+    ("/businesses/", models.Business, schemas.Business, crud.BUSINESS_SORT_KEY, crud.get_businesses,
+     schemas.BUSINESS_ROWS),
+    ("/deals/", models.Deal, schemas.Deal, crud.DEAL_SORT_KEY, crud.get_deals, schemas.DEAL_ROWS),
+    ("/comments/", models.Comment, schemas.Comment, crud.COMMENT_SORT_KEY, crud.get_comments,
+     schemas.COMMENT_ROWS),
+]
+
+
+def orm_page(db: Session, model, sort_key, limit: int):
+    """The old list query: full ORM objects"""
+    return crud._page(db.query(model), sort_key, 0, limit, None)
+
+
+def response_model_body(field, objects) -> bytes:
+    """What FastAPI does with a returned list: validate into the response_model, then encode"""
+    content = asyncio.run(serialize_response(field=field, response_content=objects))
+    return ORJSONResponse(content).body
+
+
+def timed(fn, repeat: int) -> float:
+    """Mean seconds per call"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def measure(db: Session, limit: int, repeat: int) -> dict:
+    results = {}
+    for route, model, schema, sort_key, get_rows, adapter in ROUTES:
+        field = create_model_field(name="response", type_=List[schema], mode="serialization")
+
+        def fetch_objects():
+            db.expunge_all()  # each request starts with an empty identity map
+            return orm_page(db, model, sort_key, limit)
+
+        objects = fetch_objects()
+        rows = get_rows(db, limit=limit)
+        if len(rows) < limit:
+            raise SystemExit(f"{route}: only {len(rows)} rows; seed more data")
+        before_body = response_model_body(field, objects)
+        after_body = adapter.dump_json([row._asdict() for row in rows])
+        if json.loads(before_body) != json.loads(after_body):
+            raise SystemExit(f"{route}: the two paths serialize different JSON")
+
+        before = {
+            "fetch": timed(fetch_objects, repeat),
+            "serialize": timed(lambda: response_model_body(field, objects), repeat),
+        }
+        after = {
+            "fetch": timed(lambda: get_rows(db, limit=limit), repeat),
+            "serialize": timed(lambda: adapter.dump_json([row._asdict() for row in rows]), repeat),
+        }
+        results[route] = {
+            name: {
+                **{f"{step}_us_per_row": round(seconds / limit * 1e6, 2) for step, seconds in path.items()},
+                "total_us_per_row": round(sum(path.values()) / limit * 1e6, 2),
+            }
+            for name, path in (("orm_response_model", before), ("rows_adapter", after))
+        }
+        results[route]["speedup"] = round(
+            results[route]["orm_response_model"]["total_us_per_row"]
+            / results[route]["rows_adapter"]["total_us_per_row"], 2)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--limit", type=int, default=100, help="rows per page")
+    parser.add_argument("--repeat", type=int, default=200, help="pages timed per path")
+    parser.add_argument("--businesses", type=int, default=500)
+    parser.add_argument("--deals-per-business", type=int, default=4)
+    parser.add_argument("--comments-per-deal", type=int, default=2)
+    args = parser.parse_args()
+
+    with engine.connect() as connection:
+        transaction = connection.begin()
+        try:
+            seed(connection, args.businesses, args.deals_per_business, args.comments_per_deal)
+            db = Session(bind=connection, join_transaction_mode="create_savepoint")
+            results = measure(db, args.limit, args.repeat)
+        finally:
+            transaction.rollback()
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Synthetic data for benchmarks and plan checks.
+
+Rows are generated server-side with generate_series, so seeding hundreds of thousands
+of rows takes seconds. Every seeded business gets a google_place_id tagged with the
+run's tag, so seeded data can be told apart from real rows and removed again.
+"""
+import uuid
+
+from sqlalchemy import text
+
+from app import crud, models
+
+# Spread seeded businesses over roughly the Oakland city limits
+LAT_MIN, LAT_SPAN = 37.72, 0.14
+LNG_MIN, LNG_SPAN = -122.33, 0.16
+
+
+def seed(connection, businesses: int, deals_per_business: int, comments_per_deal: int) -> str:
+    """Insert synthetic businesses/deals/comments (and schedule windows and cards); returns the run tag"""
+    tag = uuid.uuid4().hex[:8]
+    params = {"tag": tag, "pattern": f"seed-%-{tag}"}
+
+    connection.execute(text("""
+        INSERT INTO businesses (name, address, google_place_id, latitude, longitude, created_by, vote_score)
+        SELECT 'Seed Business ' || g, g || ' Broadway, Oakland, CA', 'seed-' || g || '-' || :tag,
+               :lat_min + random() * :lat_span, :lng_min + random() * :lng_span,
+               'seed', (random() * 50)::int
+        FROM generate_series(1, :n) AS g
+    """), dict(params, n=businesses, lat_min=LAT_MIN, lat_span=LAT_SPAN, lng_min=LNG_MIN, lng_span=LNG_SPAN))
+
+    connection.execute(text("""
+        INSERT INTO deals (business_id, deal_type, days_active, time_start, time_end, description,
+                           food_items, drink_items, pricing, tags, created_by, vote_score, created_at)
+        SELECT b.id, 'happy_hour',
+               ARRAY['monday', 'tuesday', 'wednesday', 'thursday', 'friday'],
+               make_time(14 + (g % 4), 0, 0), make_time(18 + (g % 4), 0, 0),
+               'Seed happy hour ' || g || ' with oysters, tacos and $5 margaritas',
+               '$1 oysters, $3 tacos', '$5 margaritas, $4 beers', '$1-5',
+               ARRAY['happy_hour', CASE WHEN g % 2 = 0 THEN 'oyster_special' ELSE 'taco_tuesday' END],
+               'seed', (random() * 100)::int - 10, now() - random() * interval '180 days'
+        FROM businesses AS b
+        CROSS JOIN generate_series(1, :per_business) AS g
+        WHERE b.google_place_id LIKE :pattern
+    """), dict(params, per_business=deals_per_business))
+
+    # Weekday windows matching the seeded times (Monday 00:00 = minute 0)
+    connection.execute(text("""
+        INSERT INTO deal_schedule_windows (deal_id, minutes)
+        SELECT d.id, int4range(day * 1440 + extract(hour FROM d.time_start)::int * 60,
+                               day * 1440 + extract(hour FROM d.time_end)::int * 60)
+        FROM deals AS d
+        JOIN businesses AS b ON b.id = d.business_id
+        CROSS JOIN generate_series(0, 4) AS day
+        WHERE b.google_place_id LIKE :pattern
+    """), params)
+
+    connection.execute(text("""
+        INSERT INTO comments (deal_id, text, created_by, vote_score, created_at)
+        SELECT d.id, 'Seed comment ' || g, 'seed', (random() * 20)::int - 5, now() - random() * interval '90 days'
+        FROM deals AS d
+        JOIN businesses AS b ON b.id = d.business_id
+        CROSS JOIN generate_series(1, :per_deal) AS g
+        WHERE b.google_place_id LIKE :pattern
+    """), dict(params, per_deal=comments_per_deal))
+
+    crud.refresh_deal_cards(connection, models.Business.google_place_id.like(params["pattern"]))
+
+    connection.execute(text("ANALYZE businesses, deals, deal_schedule_windows, deal_cards, comments"))
+    return tag
+
+
+def unseed(connection, tag: str):
+    """Delete everything a seed() run inserted"""
+    pattern = {"pattern": f"seed-%-{tag}"}
+    seeded_deals = "SELECT d.id FROM deals d JOIN businesses b ON b.id = d.business_id WHERE b.google_place_id LIKE :pattern"
+    connection.execute(text(f"DELETE FROM comments WHERE deal_id IN ({seeded_deals})"), pattern)
+    connection.execute(text(f"DELETE FROM deal_schedule_windows WHERE deal_id IN ({seeded_deals})"), pattern)
+    connection.execute(text(f"DELETE FROM deals WHERE id IN ({seeded_deals})"), pattern)
+    connection.execute(text("DELETE FROM businesses WHERE google_place_id LIKE :pattern"), pattern)
@@ -0,0 +1,85 @@
+"""
+Compare buffered JSON and streamed NDJSON responses for a large /api/deals-enriched page.
+
+Seeds --deals synthetic deals (removed again afterwards), then for each format starts a
+fresh API process and fetches every deal in one request, several times. Reports
+time-to-first-byte, total time and response size, and the server's peak RSS (VmHWM, so
+Linux only). Needs a migrated database and `pip install httpx`.
+
+    python -m benchmarks.streaming --deals 10000
+"""
+import argparse
+import json
+import time
+
+import httpx
+
+from app.database import engine
+from benchmarks.load import start_server
+from benchmarks.seed import seed, unseed
+
+FORMATS = {"json": "application/json", "ndjson": "application/x-ndjson"}
+DEALS_PER_BUSINESS = 10
+
+
+def rss_kb(pid: int, field: str) -> int:
+    """VmRSS (current) or VmHWM (peak) of a process, in kB"""
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1])
+    return 0
+
+
+def fetch(base_url: str, path: str, accept: str) -> dict:
+    started = time.perf_counter()
+    ttfb = None
+    size = 0
+    with httpx.stream("GET", base_url + path, headers={"Accept": accept}, timeout=120) as response:
+        response.raise_for_status()
+        for chunk in response.iter_raw():
+            if ttfb is None:
+                ttfb = time.perf_counter() - started
+            size += len(chunk)
+    return {"ttfb_ms": round((ttfb or 0) * 1000, 1),
+            "total_ms": round((time.perf_counter() - started) * 1000, 1), "bytes": size}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--deals", type=int, default=10000)
+    parser.add_argument("--requests", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    with engine.begin() as connection:
+        tag = seed(connection, max(1, args.deals // DEALS_PER_BUSINESS), DEALS_PER_BUSINESS, 0)
+
+    results = {}
+    path = f"/api/deals-enriched?limit={args.deals}"
+    try:
+        for name, accept in FORMATS.items():
+            server = start_server(args.port, DEALS_CACHE_TTL="0")
+            try:
+                base_url = f"http://127.0.0.1:{args.port}"
+                baseline = rss_kb(server.pid, "VmRSS")
+                runs = [fetch(base_url, path, accept) for _ in range(args.requests)]
+                results[name] = {
+                    "ttfb_ms_median": sorted(run["ttfb_ms"] for run in runs)[len(runs) // 2],
+                    "total_ms_median": sorted(run["total_ms"] for run in runs)[len(runs) // 2],
+                    "bytes": runs[-1]["bytes"],
+                    "rss_baseline_mb": round(baseline / 1024, 1),
+                    "rss_peak_mb": round(rss_kb(server.pid, "VmHWM") / 1024, 1),
+                }
+            finally:
+                server.terminate()
+                server.wait()
+    finally:
+        with engine.begin() as connection:
+            unseed(connection, tag)
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
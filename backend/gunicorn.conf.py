@@ -0,0 +1,45 @@
+"""
+Production server settings: gunicorn managing uvicorn workers, tuned from the environment.
+
+    gunicorn app.main:app -c gunicorn.conf.py
+
+Every worker opens its own connection pool; app/pool.py divides DB_MAX_CONNECTIONS
+between the WEB_CONCURRENCY workers exported below.
+"""
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def _cpu_count() -> int:
+    # Cores this container may use, not the host's
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY") or _cpu_count())
+# Workers are forked from this process, so they see the final count when sizing their pools
+os.environ["WEB_CONCURRENCY"] = str(workers)
+worker_class = "app.server.UvicornWorker"
+
+# Longer than nginx's upstream keepalive_timeout (60s), so nginx closes idle connections first
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "75"))
+backlog = int(os.getenv("GUNICORN_BACKLOG", "2048"))
+
+# Recycle workers after this many requests (0 disables); the jitter keeps them from restarting together
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "10000"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "1000"))
+
+# Seconds a silent worker may live before it's killed, and to finish in-flight requests on shutdown
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+
+# Each worker imports the app itself: engines and pools must not be shared across fork()
+preload_app = False
+
+accesslog = os.getenv("GUNICORN_ACCESS_LOG") or None  # "-" logs to stdout
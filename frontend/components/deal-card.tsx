@@ -20,8 +20,13 @@ interface Deal {
   created_by: string | null
   created_at: string
   image_url?: string
+  // Resized variants of image_url, when the backend hosts them
+  image_srcset?: { webp: string; jpeg: string } | null
 }
 
+// Cards span the grid's columns: full width on phones, about a third on desktop
+const CARD_IMAGE_SIZES = "(min-width: 768px) 33vw, 100vw"
+
 interface DealCardProps {
   deal: Deal
 }
@@ -58,10 +63,25 @@ export function DealCard({ deal }: DealCardProps) {
       <Card className="relative flex h-[280px] md:h-full flex-col transition-shadow hover:shadow-md cursor-pointer overflow-hidden">
         {deal.image_url && (
           <>
-            <div
-              className="absolute inset-0 bg-cover bg-center"
-              style={{ backgroundImage: `url(${deal.image_url})` }}
-            />
+            {deal.image_srcset ? (
+              <picture>
+                <source type="image/webp" srcSet={deal.image_srcset.webp} sizes={CARD_IMAGE_SIZES} />
+                <img
+                  src={deal.image_url}
+                  srcSet={deal.image_srcset.jpeg}
+                  sizes={CARD_IMAGE_SIZES}
+                  alt=""
+                  loading="lazy"
+                  decoding="async"
+                  className="absolute inset-0 h-full w-full object-cover"
+                />
+              </picture>
+            ) : (
+              <div
+                className="absolute inset-0 bg-cover bg-center"
+                style={{ backgroundImage: `url(${deal.image_url})` }}
+              />
+            )}
             <div className="absolute inset-0 bg-gradient-to-t from-black/80 via-black/60 to-black/40" />
           </>
         )}
@@ -12,6 +12,7 @@ import { Dialog, DialogContent, DialogHeader, DialogTitle, DialogTrigger } from
 import { Checkbox } from "@/components/ui/checkbox"
 import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from "@/components/ui/select"
 import { useToast } from "@/hooks/use-toast"
+import { useLiveEvents } from "@/hooks/use-live-events"
 import { ArrowUp, ArrowDown, Loader2, Send, Clock, ArrowLeft, Pencil, MapPin, Phone, Navigation } from "lucide-react"
 import { SAMPLE_DEALS, SAMPLE_COMMENTS } from "@/lib/sample-data"
 import Link from "next/link"
@@ -87,6 +88,22 @@ const DealDetails: React.FC<{ dealId: number }> = ({ dealId }) => {
 
   const DAYS_OF_WEEK = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
 
+  // Apply other people's votes as they happen
+  useLiveEvents((event) => {
+    if (event.type !== "vote") return
+    if (event.entity_type === "deal" && event.id === dealId) {
+      setDeal((prev) => (prev ? { ...prev, vote_count: event.vote_score } : prev))
+    } else if (event.entity_type === "comment") {
+      setComments((prev) =>
+        prev.some((comment) => comment.id === event.id)
+          ? prev
+              .map((comment) => (comment.id === event.id ? { ...comment, vote_count: event.vote_score } : comment))
+              .sort((a, b) => b.vote_count - a.vote_count)
+          : prev,
+      )
+    }
+  })
+
   // Check if user has already voted on this deal
   useEffect(() => {
     const voteKey = `voted_deal_${dealId}`
@@ -100,25 +117,21 @@ const DealDetails: React.FC<{ dealId: number }> = ({ dealId }) => {
     const fetchDeal = async () => {
       try {
         console.log('🔍 Starting to fetch deal, dealId:', dealId)
-        // Fetch the deal from the API
-        const apiUrl = `${process.env.NEXT_PUBLIC_API_URL}/api/deals-enriched`
+        // Fetch just this deal from the API
+        const apiUrl = `${process.env.NEXT_PUBLIC_API_URL}/api/deals-enriched/${dealId}`
         console.log('🔍 Fetching from:', apiUrl)
         const response = await fetch(apiUrl)
         console.log('🔍 Response status:', response.status, response.ok)
-        if (!response.ok) {
-          throw new Error('Failed to fetch deals')
+        if (!response.ok && response.status !== 404) {
+          throw new Error('Failed to fetch deal')
         }
-        const deals = await response.json()
-        console.log('🔍 Fetched deals count:', deals.length)
-        const foundDeal = deals.find((d: Deal) => d.id === dealId)
-        console.log('🔍 Looking for deal with id:', dealId, 'Type:', typeof dealId)
+        const foundDeal: Deal | null = response.ok ? await response.json() : null
 
         console.log('📍 Found deal:', {
           id: foundDeal?.id,
           name: foundDeal?.restaurant_name,
           hasLocation: !!foundDeal?.location,
           location: foundDeal?.location,
-          allDealsCount: deals.length,
           dealKeys: foundDeal ? Object.keys(foundDeal) : []
         })
 
@@ -296,29 +309,18 @@ const DealDetails: React.FC<{ dealId: number }> = ({ dealId }) => {
 
       // If changing vote (had upvote, now downvote or vice versa)
       if (hasVoted && hasVoted !== direction) {
-        // First, remove the old vote
-        const removeResponse = await fetch(`${process.env.NEXT_PUBLIC_API_URL}/deals/${deal.id}/vote`, {
-          method: 'POST',
-          headers: { 'Content-Type': 'application/json' },
-          body: JSON.stringify({ vote: hasVoted === "up" ? -1 : 1 })
-        })
-
-        if (!removeResponse.ok) {
-          throw new Error('Failed to change vote')
-        }
-
-        // Then add the new vote
-        const addResponse = await fetch(`${process.env.NEXT_PUBLIC_API_URL}/deals/${deal.id}/vote`, {
+        // Remove the old vote and add the new one in a single request
+        const response = await fetch(`${process.env.NEXT_PUBLIC_API_URL}/votes/batch`, {
           method: 'POST',
           headers: { 'Content-Type': 'application/json' },
-          body: JSON.stringify({ vote: direction === "up" ? 1 : -1 })
+          body: JSON.stringify({ votes: [{ entity_type: "deal", id: deal.id, delta: direction === "up" ? 2 : -2 }] })
         })
 
-        if (!addResponse.ok) {
+        if (!response.ok) {
           throw new Error('Failed to change vote')
         }
 
-        const updatedDeal = await addResponse.json()
+        const [updatedDeal] = await response.json()
         setDeal({ ...deal, vote_count: updatedDeal.vote_score })
 
         // Update vote in localStorage
@@ -393,29 +395,18 @@ const DealDetails: React.FC<{ dealId: number }> = ({ dealId }) => {
 
       // If changing vote (had upvote, now downvote or vice versa)
       if (currentVote && currentVote !== direction) {
-        // First, remove the old vote
-        const removeResponse = await fetch(`${process.env.NEXT_PUBLIC_API_URL}/comments/${commentId}/vote`, {
+        // Remove the old vote and add the new one in a single request
+        const response = await fetch(`${process.env.NEXT_PUBLIC_API_URL}/votes/batch`, {
           method: 'POST',
           headers: { 'Content-Type': 'application/json' },
-          body: JSON.stringify({ vote: currentVote === "up" ? -1 : 1 })
+          body: JSON.stringify({ votes: [{ entity_type: "comment", id: commentId, delta: direction === "up" ? 2 : -2 }] })
         })
 
-        if (!removeResponse.ok) {
-          throw new Error('Failed to change vote')
-        }
-
-        // Then add the new vote
-        const addResponse = await fetch(`${process.env.NEXT_PUBLIC_API_URL}/comments/${commentId}/vote`, {
-          method: 'POST',
-          headers: { 'Content-Type': 'application/json' },
-          body: JSON.stringify({ vote: direction === "up" ? 1 : -1 })
-        })
-
-        if (!addResponse.ok) {
+        if (!response.ok) {
           throw new Error('Failed to change vote')
         }
 
-        const updatedComment = await addResponse.json()
+        const [updatedComment] = await response.json()
         setComments((prev) =>
           prev
             .map((comment) =>
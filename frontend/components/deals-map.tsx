@@ -4,6 +4,7 @@ import { useEffect, useState, useRef } from "react"
 import { Loader2, MapPin } from "lucide-react"
 import { SAMPLE_DEALS } from "@/lib/sample-data"
 import { loadGoogleMapsAPI } from "@/lib/google-maps-loader"
+import { useLiveEvents } from "@/hooks/use-live-events"
 
 declare global {
   interface Window {
@@ -25,11 +26,25 @@ export function DealsMap() {
   const [deals, setDeals] = useState<Deal[]>([])
   const mapRef = useRef<HTMLDivElement>(null)
   const mapInstanceRef = useRef<any>(null)
+  const markersRef = useRef<any[]>([])
+  const refreshRef = useRef<(() => void) | null>(null)
+
+  // New deals (or missed events) refresh the pins in view
+  useLiveEvents((event) => {
+    if (event.type === "deal_created" || event.type === "resync") refreshRef.current?.()
+  })
 
   useEffect(() => {
-    const fetchDeals = async () => {
+    // Only fetch the pins inside the current viewport
+    const fetchDealsInView = async (map: any) => {
+      const bounds = map.getBounds()
+      if (!bounds) return
+      const sw = bounds.getSouthWest()
+      const ne = bounds.getNorthEast()
+      const bbox = [sw.lat(), sw.lng(), ne.lat(), ne.lng()].map((n) => n.toFixed(5)).join(",")
+
       try {
-        const response = await fetch(`${process.env.NEXT_PUBLIC_API_URL}/api/deals-enriched`)
+        const response = await fetch(`${process.env.NEXT_PUBLIC_API_URL}/api/deals-enriched?bbox=${bbox}`)
         if (!response.ok) {
           throw new Error('Failed to fetch deals')
         }
@@ -42,13 +57,7 @@ export function DealsMap() {
       }
     }
 
-    fetchDeals()
-  }, [])
-
-  useEffect(() => {
     const initializeMap = async () => {
-      if (deals.length === 0) return
-
       try {
         await loadGoogleMapsAPI()
 
@@ -80,30 +89,9 @@ export function DealsMap() {
           })
           mapInstanceRef.current = map
 
-          deals.forEach((deal) => {
-            if (!deal.location) return
-
-            const marker = new window.google.maps.Marker({
-              map,
-              position: deal.location,
-              title: deal.restaurant_name,
-            })
-
-            const infoWindow = new window.google.maps.InfoWindow({
-              content: `
-                <div style="padding: 8px; max-width: 200px;">
-                  <a href="/deals/${deal.id}" style="font-weight: 600; color: #2563eb; text-decoration: none; display: block; margin-bottom: 4px; cursor: pointer;" onmouseover="this.style.textDecoration='underline'" onmouseout="this.style.textDecoration='none'">
-                    ${deal.restaurant_name}
-                  </a>
-                  <p style="font-size: 14px; margin: 0; color: #666;">${deal.deal_description}</p>
-                </div>
-              `,
-            })
-
-            marker.addListener("click", () => {
-              infoWindow.open(map, marker)
-            })
-          })
+          // "idle" fires once the map settles after load, pan or zoom
+          map.addListener("idle", () => fetchDealsInView(map))
+          refreshRef.current = () => fetchDealsInView(map)
 
           setIsLoading(false)
         }
@@ -115,6 +103,42 @@ export function DealsMap() {
     }
 
     initializeMap()
+  }, [])
+
+  useEffect(() => {
+    const map = mapInstanceRef.current
+    if (!map) return
+
+    // Replace the previous viewport's markers
+    markersRef.current.forEach((marker) => marker.setMap(null))
+    markersRef.current = []
+
+    deals.forEach((deal) => {
+      if (!deal.location) return
+
+      const marker = new window.google.maps.Marker({
+        map,
+        position: deal.location,
+        title: deal.restaurant_name,
+      })
+
+      const infoWindow = new window.google.maps.InfoWindow({
+        content: `
+          <div style="padding: 8px; max-width: 200px;">
+            <a href="/deals/${deal.id}" style="font-weight: 600; color: #2563eb; text-decoration: none; display: block; margin-bottom: 4px; cursor: pointer;" onmouseover="this.style.textDecoration='underline'" onmouseout="this.style.textDecoration='none'">
+              ${deal.restaurant_name}
+            </a>
+            <p style="font-size: 14px; margin: 0; color: #666;">${deal.deal_description}</p>
+          </div>
+        `,
+      })
+
+      marker.addListener("click", () => {
+        infoWindow.open(map, marker)
+      })
+
+      markersRef.current.push(marker)
+    })
   }, [deals])
 
   return (
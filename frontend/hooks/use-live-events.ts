@@ -0,0 +1,33 @@
+import * as React from 'react'
+
+export type LiveEvent =
+  | { type: 'deal_created'; deal_id: number; business_id: number }
+  | { type: 'comment_created'; comment_id: number; deal_id: number | null; business_id: number | null }
+  | { type: 'vote'; entity_type: 'business' | 'deal' | 'comment'; id: number; vote_score: number }
+  | { type: 'resync' }
+
+const EVENT_TYPES = ['deal_created', 'comment_created', 'vote', 'resync'] as const
+
+// Subscribe to the backend's live feed (Server-Sent Events). Events sent while the
+// connection was down aren't replayed, so a reconnect is reported as "resync" too:
+// refetch whatever is on screen.
+export function useLiveEvents(onEvent: (event: LiveEvent) => void) {
+  const onEventRef = React.useRef(onEvent)
+  onEventRef.current = onEvent
+
+  React.useEffect(() => {
+    const source = new EventSource(`${process.env.NEXT_PUBLIC_API_URL}/events`)
+    let connectedBefore = false
+
+    const dispatch = (message: MessageEvent) => {
+      onEventRef.current({ ...JSON.parse(message.data), type: message.type } as LiveEvent)
+    }
+    EVENT_TYPES.forEach((type) => source.addEventListener(type, dispatch))
+    source.onopen = () => {
+      if (connectedBefore) onEventRef.current({ type: 'resync' })
+      connectedBefore = true
+    }
+
+    return () => source.close()
+  }, [])
+}